@@ -0,0 +1,87 @@
+"""
+Compares the memory held by slotted Response objects with compact headers against the previous representation
+(a plain object with a __dict__, an OrderedDict backed CaseInsensitiveDict and an eagerly created cookie jar).
+
+Usage: python benchmarks/response_memory.py [count]
+"""
+import gc
+import sys
+import tracemalloc
+
+from noble_tls.cookies import cookiejar_from_dict
+from noble_tls.response import build_response
+from noble_tls.utils.structures import CaseInsensitiveDict
+
+RAW_RESPONSE = {
+    "target": "https://example.com/api/items?page=1",
+    "status": 200,
+    "body": '{"items": []}',
+    "headers": {
+        "Content-Type": ["application/json; charset=utf-8"],
+        "Content-Length": ["13"],
+        "Date": ["Mon, 01 Jan 2024 00:00:00 GMT"],
+        "Server": ["nginx"],
+        "Cache-Control": ["no-cache"],
+        "Vary": ["Accept-Encoding"],
+        "X-Request-Id": ["2b1f4f1c-6e7a-4a8b-9c55-1f0f3d1b2c3d"],
+        "Strict-Transport-Security": ["max-age=31536000"],
+        "Set-Cookie": ["a=1; Path=/", "b=2; Path=/"],
+    },
+}
+
+
+class LegacyResponse:
+    """The Response layout before it was slotted."""
+
+    def __init__(self):
+        self.url = None
+        self.status_code = None
+        self.text = None
+        self.headers = CaseInsensitiveDict()
+        self.cookies = cookiejar_from_dict({})
+        self._content = None
+        self._content_consumed = False
+        self.history = []
+
+
+def build_legacy_response(res):
+    response = LegacyResponse()
+    response.url = res.get("target")
+    response.status_code = res.get("status", 0)
+    response.text = res.get("body", "")
+    response_headers = CaseInsensitiveDict()
+    for key, value in res.get("headers", {}).items():
+        response_headers[key] = value[0] if len(value) == 1 else value
+    response.headers = response_headers
+    return response
+
+
+def build_compact_response(res):
+    response = build_response(res, None)
+    response.headers  # materialize the headers, as batch post-processing would
+    return response
+
+
+def measure(builder, count):
+    gc.collect()
+    tracemalloc.start()
+    responses = [builder(dict(RAW_RESPONSE)) for _ in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del responses
+    return current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    legacy = measure(build_legacy_response, count)
+    compact = measure(build_compact_response, count)
+
+    print(f">> {count} responses")
+    print(f">> legacy:  {legacy / 1024 / 1024:8.1f} MiB ({legacy / count:6.0f} B/response)")
+    print(f">> compact: {compact / 1024 / 1024:8.1f} MiB ({compact / count:6.0f} B/response)")
+    print(f">> saving:  {100 * (1 - compact / legacy):8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
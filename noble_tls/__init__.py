@@ -11,6 +11,14 @@ from .utils.asset import generate_asset_name
 from .utils.asset import root_dir
 from .utils.identifiers import Client
 from .sessions import Session
+from .session_pool import SessionPool
+from .session_router import SessionRouter
+from .limits import HostLimiter, AdaptiveLimiter
+from .retry import RetryPolicy, RetryBudget, get_retry_budget
+from .hedging import HedgePolicy
+from .cache import ResponseCache
+from .multipart import MultipartEncoder
+from .c.cffi import FFIWorkerPool, configure_worker_pool, get_worker_pool, destroy_all
 
 
 # Huge thanks to:
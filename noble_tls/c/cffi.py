@@ -1,10 +1,17 @@
 import asyncio
 import os
 import ctypes
+import queue
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 
 from noble_tls.exceptions.exceptions import TLSClientException
 from noble_tls.updater.file_fetch import read_version_info, download_if_necessary
 from noble_tls.utils.asset import generate_asset_name, root_dir
+from noble_tls.utils.json_codec import get_codec
+from noble_tls.response import decode_byte_body
 
 
 async def check_and_download_dependencies():
@@ -88,3 +95,374 @@ request.restype = ctypes.c_char_p
 free_memory = library.freeMemory
 free_memory.argtypes = [ctypes.c_char_p]
 free_memory.restype = ctypes.c_char_p
+
+# Older tls-client releases do not export the session cleanup functions
+destroy_session = getattr(library, "destroySession", None)
+if destroy_session is not None:
+    destroy_session.argtypes = [ctypes.c_char_p]
+    destroy_session.restype = ctypes.c_char_p
+
+destroy_all_sessions = getattr(library, "destroyAll", None)
+if destroy_all_sessions is not None:
+    destroy_all_sessions.argtypes = []
+    destroy_all_sessions.restype = ctypes.c_char_p
+
+
+def _free_response(response_id: str) -> None:
+    free_memory(response_id.encode('utf-8'))
+
+
+def _destroy_result(response_bytes: bytes) -> bool:
+    response_object = get_codec().loads(response_bytes)
+    _free_response(response_object['id'])
+    return bool(response_object.get("success", False))
+
+
+def destroy_session_by_id(session_id: str) -> bool:
+    """
+    Release the Go-side client, connections and cookie jar of a session. Blocks until the library is done.
+    :param session_id: The ``sessionId`` the session's requests were sent with.
+    :return: True if the library reported success, False if it failed or does not support destroying sessions.
+    """
+    if destroy_session is None:
+        return False
+    return _destroy_result(destroy_session(get_codec().dumps({"sessionId": session_id})))
+
+
+def destroy_all() -> bool:
+    """
+    Release the Go-side state of every session in the process. Sessions that are used again afterwards start over
+    with a fresh client.
+    :return: True if the library reported success, False if it failed or does not support destroying sessions.
+    """
+    if destroy_all_sessions is None:
+        return False
+    return _destroy_result(destroy_all_sessions())
+
+
+# Default number of threads that may sit inside the shared library at once. Calls into tls-client block for the whole
+# network round trip (ctypes releases the GIL meanwhile), so this is sized for I/O rather than for CPU count.
+DEFAULT_FFI_WORKERS = 64
+
+# Maximum number of queued releases handled by the reaper thread before it looks at its queue again
+REAPER_BATCH_SIZE = 256
+
+# Responses of at least this many bytes are decoded on the worker thread instead of the event loop
+WORKER_DECODE_THRESHOLD = 64 * 1024
+
+
+def request_batch(jobs: queue.SimpleQueue, results: list, loads: Optional[Callable] = None) -> int:
+    """
+    Call ``request`` for payloads taken from a shared queue until it is empty, parsing and freeing every response here.
+    Several worker calls can drain the same queue, so a slow request only holds up the worker sending it while the
+    others keep taking the next payload.
+    :param jobs: Queue of (index, JSON encoded request payload) tuples.
+    :param results: Receives the parsed response object, or the exception a payload failed with, at its index.
+    :param loads: JSON parser for the responses, defaults to the process-wide codec.
+    :return: The number of payloads this call sent.
+    """
+    loads = loads or get_codec().loads
+    sent = 0
+    while True:
+        try:
+            index, payload = jobs.get_nowait()
+        except queue.Empty:
+            return sent
+        try:
+            response_object = loads(request(payload))
+            _free_response(response_object['id'])
+        except Exception as e:
+            response_object = e
+        results[index] = response_object
+        sent += 1
+
+
+class ResponseHandoff:
+    """
+    Hands a response from the worker thread over to the awaiting coroutine.
+
+    If that coroutine is cancelled while the library call is still running, nobody is left to free the response.
+    Whichever side comes second (the worker delivering, or the coroutine abandoning) frees it instead.
+    """
+
+    __slots__ = ("_lock", "_abandoned", "_response", "_loads")
+
+    def __init__(self, loads: Optional[Callable] = None) -> None:
+        self._lock = threading.Lock()
+        self._abandoned = False
+        self._response = None
+        self._loads = loads
+
+    def deliver(self, response) -> bool:
+        """
+        Called on the worker thread with the result of ``request_response``.
+        :return: False if the coroutine is gone and the response was freed.
+        """
+        with self._lock:
+            if not self._abandoned:
+                self._response = response
+                return True
+        self._free(response)
+        return False
+
+    def abandon(self) -> None:
+        """Called by the coroutine when it is cancelled before receiving the response."""
+        with self._lock:
+            self._abandoned = True
+            response, self._response = self._response, None
+        if response is not None:
+            self._free(response)
+
+    def _free(self, response) -> None:
+        # parsed responses were already freed on the worker thread
+        if isinstance(response, bytes):
+            _free_response((self._loads or get_codec().loads)(response)['id'])
+
+
+def request_response(
+        payload: bytes,
+        decode_threshold: Optional[int] = WORKER_DECODE_THRESHOLD,
+        loads: Optional[Callable] = None,
+        handoff: Optional[ResponseHandoff] = None,
+        is_byte_response: bool = False
+):
+    """
+    Call ``request`` and, for large responses, decode and free them on the calling (worker) thread.
+    :param payload: JSON encoded request payload.
+    :param decode_threshold: Responses of at least this many bytes are parsed and freed here.
+        0 decodes every response here, None never does.
+    :param loads: JSON parser for the response, defaults to the process-wide codec.
+    :param handoff: Frees the response if the awaiting coroutine was cancelled in the meantime.
+    :param is_byte_response: The body is base64 encoded, a response parsed here gets its body decoded to bytes too.
+    :return: The parsed response object, or the raw response bytes if it was below the threshold. Raw bytes
+        still have to be freed by the caller. None if the handoff was abandoned.
+    """
+    # the c_char_p return type already copies the response out of the library's memory
+    response = request(payload)
+    if decode_threshold is not None and len(response) >= decode_threshold:
+        response = (loads or get_codec().loads)(response)
+        _free_response(response['id'])
+        if is_byte_response and response.get("status") and isinstance(response.get("body"), str):
+            response["body"] = decode_byte_body(response["body"])
+
+    if handoff is not None and not handoff.deliver(response):
+        return None
+    return response
+
+
+class FFIWorkerPool:
+    """
+    Dedicated, bounded thread pool for calls into the shared library.
+
+    tls-client calls never share threads with other blocking jobs on the event loop's default executor.
+    ``max_workers`` caps how many calls run inside the library at once, ``max_pending`` caps how many calls may be
+    handed to the pool at once (queued + running). Callers beyond ``max_pending`` wait on the event loop instead of
+    piling up in the executor queue.
+    """
+
+    def __init__(
+            self,
+            max_workers: Optional[int] = None,
+            max_pending: Optional[int] = None,
+            thread_name_prefix: str = "noble-tls-ffi"
+    ) -> None:
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_pending is not None and max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+
+        self.max_workers = max_workers or DEFAULT_FFI_WORKERS
+        self.max_pending = max_pending
+        self.thread_name_prefix = thread_name_prefix
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # one admission gate per event loop, asyncio primitives must not be shared between loops
+        self._gates = weakref.WeakKeyDictionary()
+        self._reaper: Optional[threading.Thread] = None
+        self._reaper_queue = queue.SimpleQueue()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "pending": 0,
+            "peak_pending": 0,
+            "active": 0,
+            "peak_active": 0,
+            "freed": 0,
+            "destroyed": 0,
+        }
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Lazily creates the underlying executor, threads are only spawned once a call is made."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=self.thread_name_prefix
+                    )
+        return self._executor
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Snapshot of the pool counters.
+        :return: Dictionary with submitted/completed/failed totals, current and peak pending and active calls.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["max_workers"] = self.max_workers
+        stats["max_pending"] = self.max_pending
+        return stats
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """
+        Run ``func(*args)`` on one of the pool's threads and await its result.
+        :param func: Blocking callable, usually a function exported by the shared library.
+        :param args: Positional arguments passed to ``func``.
+        :return: Whatever ``func`` returns.
+        """
+        loop = asyncio.get_event_loop()
+        if self.max_pending is None:
+            return await self._submit(loop, func, args)
+
+        async with self._gate(loop):
+            return await self._submit(loop, func, args)
+
+    def release(self, response_id: str) -> None:
+        """
+        Schedule a tls-client response to be freed without waiting for it.
+        :param response_id: The ``id`` field of the response returned by ``request``.
+        """
+        self._defer("freed", _free_response, response_id)
+
+    def release_session(self, session_id: str) -> None:
+        """
+        Schedule the Go-side state of a session to be destroyed without waiting for it.
+        :param session_id: The ``sessionId`` the session's requests were sent with.
+        """
+        self._defer("destroyed", destroy_session_by_id, session_id)
+
+    def _defer(self, stat: str, func: Callable, arg: str) -> None:
+        if self._reaper is None:
+            with self._lock:
+                if self._reaper is None:
+                    self._reaper = threading.Thread(
+                        target=self._reap,
+                        name=f"{self.thread_name_prefix}-reaper",
+                        daemon=True
+                    )
+                    self._reaper.start()
+        self._reaper_queue.put((stat, func, arg))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shuts down the underlying executor, calls that are already running are allowed to finish.
+        Responses and sessions already handed to the reaper are still released.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            reaper, self._reaper = self._reaper, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        if reaper is not None:
+            self._reaper_queue.put(None)
+            if wait:
+                reaper.join()
+
+    def _gate(self, loop) -> asyncio.Semaphore:
+        gate = self._gates.get(loop)
+        if gate is None:
+            gate = self._gates[loop] = asyncio.Semaphore(self.max_pending)
+        return gate
+
+    async def _submit(self, loop, func: Callable, args: tuple) -> Any:
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._stats["pending"] += 1
+            self._stats["peak_pending"] = max(self._stats["peak_pending"], self._stats["pending"])
+        try:
+            result = await loop.run_in_executor(self.executor, self._call, func, args)
+        except BaseException:
+            self._count("failed")
+            raise
+        else:
+            self._count("completed")
+            return result
+        finally:
+            with self._lock:
+                self._stats["pending"] -= 1
+
+    def _call(self, func: Callable, args: tuple) -> Any:
+        # runs on a worker thread
+        with self._lock:
+            self._stats["active"] += 1
+            self._stats["peak_active"] = max(self._stats["peak_active"], self._stats["active"])
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._stats["active"] -= 1
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+    def _reap(self) -> None:
+        # runs on the reaper thread, drains whatever is queued and releases it in one go
+        while True:
+            batch = [self._reaper_queue.get()]
+            while len(batch) < REAPER_BATCH_SIZE:
+                try:
+                    batch.append(self._reaper_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            for item in batch:
+                if item is None:
+                    continue
+                stat, func, arg = item
+                try:
+                    func(arg)
+                    self._count(stat)
+                except Exception as e:
+                    print(f">> Failed to release tls-client resource {arg}: {e}")
+            if stop:
+                return
+
+
+_worker_pool: Optional[FFIWorkerPool] = None
+_worker_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> FFIWorkerPool:
+    """
+    Return the process-wide pool used by sessions that were not given their own.
+    :return: The shared FFIWorkerPool, created on first use.
+    """
+    global _worker_pool
+    if _worker_pool is None:
+        with _worker_pool_lock:
+            if _worker_pool is None:
+                _worker_pool = FFIWorkerPool()
+    return _worker_pool
+
+
+def configure_worker_pool(
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None
+) -> FFIWorkerPool:
+    """
+    Replace the process-wide pool. Calls already running on the previous pool are allowed to finish.
+    :param max_workers: Maximum number of threads calling into the shared library at once.
+    :param max_pending: Maximum number of calls handed to the pool at once, None for unbounded.
+    :return: The new shared FFIWorkerPool.
+    """
+    global _worker_pool
+    with _worker_pool_lock:
+        previous, _worker_pool = _worker_pool, FFIWorkerPool(max_workers=max_workers, max_pending=max_pending)
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return _worker_pool
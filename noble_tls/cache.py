@@ -0,0 +1,398 @@
+import asyncio
+import binascii
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+from .utils.json_codec import get_codec
+
+CACHEABLE_STATUS_CODES = frozenset({200, 203, 300, 301, 308, 404, 410})
+
+# Headers of a 304 that must not overwrite the stored response's headers
+NOT_MODIFIED_SKIP_HEADERS = frozenset({"content-length", "content-encoding", "transfer-encoding", "content-range"})
+
+# Request headers carrying credentials, responses to them are only stored when Vary lists the header
+CREDENTIAL_HEADERS = ("authorization", "cookie")
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header.
+    :param value: Header value, e.g. 'max-age=60, must-revalidate'.
+    :return: Dictionary of lower-cased directives and their values, None for directives without a value.
+    """
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _header(headers: Dict[str, List[str]], name: str) -> Optional[str]:
+    """Case-insensitive lookup in a tls-client header dict, multiple values are joined with commas."""
+    name = name.lower()
+    values = [value for key, values in headers.items() if key.lower() == name for value in values]
+    return ", ".join(values) if values else None
+
+
+def _request_header(request_payload: dict, name: str) -> Optional[str]:
+    if name == "cookie":
+        cookies = request_payload.get("requestCookies") or []
+        joined = "; ".join(f"{cookie['name']}={cookie['value']}" for cookie in cookies)
+        if joined:
+            return joined
+    for key, value in (request_payload.get("headers") or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _entry_size(response_object: dict) -> int:
+    """Approximate memory taken by a stored response object: its body and headers."""
+    return len(response_object.get("body") or "") + sum(
+        len(name) + sum(map(len, values)) for name, values in response_object["headers"].items()
+    )
+
+
+class CacheEntry:
+    """A stored tls-client response object along with what is needed to decide whether it may be reused."""
+
+    __slots__ = ("response_object", "stored_at", "expires_at", "vary", "size")
+
+    def __init__(self, response_object: dict, stored_at: float, expires_at: float, vary: Tuple, size: int) -> None:
+        self.response_object = response_object
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.vary = vary  # ((header name, request value), ...)
+        self.size = size
+
+    @property
+    def etag(self) -> Optional[str]:
+        return _header(self.response_object["headers"], "etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return _header(self.response_object["headers"], "last-modified")
+
+    def fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def to_dict(self) -> dict:
+        response_object = self.response_object
+        if isinstance(response_object.get("body"), bytes):
+            # byte bodies decoded on the worker thread go back to the data URI tls-client sends, JSON has no bytes
+            body = binascii.b2a_base64(response_object["body"], newline=False).decode('ascii')
+            response_object = dict(response_object, body=f"data:application/octet-stream;base64,{body}")
+        return {
+            "response": response_object,
+            "stored_at": self.stored_at,
+            "expires_at": self.expires_at,
+            "vary": [list(item) for item in self.vary],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CacheEntry":
+        response_object = data["response"]
+        vary = tuple(map(tuple, data["vary"]))
+        return cls(response_object, data["stored_at"], data["expires_at"], vary, _entry_size(response_object))
+
+
+class ResponseCache:
+    """
+    Private HTTP cache for Session GET requests.
+
+    Responses are kept in a least recently used memory tier bounded by ``max_size`` bytes and, with ``directory``,
+    in a second tier on disk bounded by ``disk_max_size`` bytes that memory evictions spill into. Freshness follows
+    Cache-Control (max-age, no-cache, no-store) and Expires; Vary is honoured, cookies included. Stale responses with an
+    ETag or Last-Modified are revalidated with If-None-Match / If-Modified-Since, and a 304 answer is turned back into
+    the full stored response. Set-Cookie headers are not stored, so cache hits never touch the cookie jar.
+
+    One cache can be shared between sessions. Entries are keyed by the redirect, proxy and certificate verification
+    settings of the request as well as its URL, and responses to requests sending an Authorization header or cookies
+    are only stored when the response's Vary header lists them, so one session's credentials never answer another's
+    requests.
+
+    Example:
+        session = Session(client=Client.CHROME_120, cache=ResponseCache(max_size=64 * 1024 * 1024))
+    """
+
+    def __init__(
+            self,
+            max_size: int = 32 * 1024 * 1024,
+            directory: Optional[str] = None,
+            disk_max_size: int = 512 * 1024 * 1024,
+            cacheable_statuses=CACHEABLE_STATUS_CODES
+    ) -> None:
+        """
+        :param max_size: Maximum size of the memory tier in bytes, bodies and headers counted.
+        :param directory: Directory of the disk tier, None keeps responses in memory only.
+        :param disk_max_size: Maximum size of the disk tier in bytes.
+        :param cacheable_statuses: Response status codes that are stored.
+        """
+        self.max_size = max_size
+        self.directory = directory
+        self.disk_max_size = disk_max_size
+        self.cacheable_statuses = frozenset(cacheable_statuses)
+
+        self._memory: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self._memory_size = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # file name -> size, least recently used first
+        self._disk_size = 0
+        self._stats = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0}
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            files = sorted(os.scandir(directory), key=lambda file: file.stat().st_mtime)
+            for file in files:
+                if file.name.endswith(".json"):
+                    self._disk[file.name] = file.stat().st_size
+                    self._disk_size += self._disk[file.name]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Snapshot of the cache counters.
+        :return: Dictionary with the number of fresh hits, misses, successful revalidations, stored responses, and
+            the number and size of the entries of both tiers.
+        """
+        stats = dict(self._stats)
+        stats.update(
+            entries=len(self._memory), size=self._memory_size, disk_entries=len(self._disk), disk_size=self._disk_size
+        )
+        return stats
+
+    def clear(self) -> None:
+        """Drop every stored response, on disk as well."""
+        self._memory.clear()
+        self._memory_size = 0
+        for name in list(self._disk):
+            self._remove_file(name)
+
+    @staticmethod
+    def key(request_payload: dict) -> Optional[Tuple]:
+        """
+        :return: The cache key of a request payload, or None if the request must not use the cache.
+        """
+        if request_payload["requestMethod"].upper() != "GET" or "streamOutputPath" in request_payload:
+            return None
+        request_directives = parse_cache_control(_request_header(request_payload, "cache-control"))
+        if "no-store" in request_directives or _request_header(request_payload, "range") is not None:
+            return None
+        return (
+            request_payload["requestUrl"],
+            bool(request_payload.get("isByteResponse")),
+            bool(request_payload.get("followRedirects")),
+            request_payload.get("proxyUrl") or None,
+            bool(request_payload.get("insecureSkipVerify")),
+        )
+
+    async def lookup(self, key: Tuple, request_payload: dict) -> Optional[CacheEntry]:
+        """
+        Find the stored response for a request.
+        :return: The matching entry, fresh or not, or None.
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+        elif self.directory is not None and self._file_name(key) in self._disk:
+            name = self._file_name(key)
+            entry = await asyncio.get_event_loop().run_in_executor(None, self._read_file, name)
+            # the entry moves back into memory
+            self._remove_file(name)
+            if entry is not None:
+                await self._spill(self._remember(key, entry))
+
+        if entry is None or any(_request_header(request_payload, name) != value for name, value in entry.vary):
+            self._stats["misses"] += 1
+            return None
+        return entry
+
+    def hit(self, entry: CacheEntry, request_payload: dict, now: Optional[float] = None) -> Optional[dict]:
+        """
+        :return: A copy of the stored response object if the entry can be used without revalidation, otherwise None.
+        """
+        no_cache = "no-cache" in parse_cache_control(_request_header(request_payload, "cache-control"))
+        if no_cache or not entry.fresh(time.time() if now is None else now):
+            return None
+        self._stats["hits"] += 1
+        return dict(entry.response_object, headers=dict(entry.response_object["headers"]))
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry) -> Dict[str, str]:
+        """:return: The validators to revalidate a stale entry with, empty if it has none."""
+        headers = {}
+        if entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    async def revalidated(self, key: Tuple, entry: CacheEntry, not_modified: dict) -> dict:
+        """
+        Merge a 304 answer into a stale entry and store it again.
+        :return: A copy of the refreshed stored response object, with the Set-Cookie headers of the 304 so they still
+            reach the session's cookie jar.
+        """
+        headers = dict(entry.response_object["headers"])
+        set_cookie = {}
+        for name, values in (not_modified.get("headers") or {}).items():
+            if name.lower() in ("set-cookie", "set-cookie2"):
+                set_cookie[name] = values
+                continue
+            if name.lower() in NOT_MODIFIED_SKIP_HEADERS:
+                continue
+            for existing in [existing for existing in headers if existing.lower() == name.lower()]:
+                del headers[existing]
+            headers[name] = values
+        response_object = dict(entry.response_object, headers=headers)
+
+        self._stats["revalidated"] += 1
+        await self.store(key, response_object, vary_request=None, previous=entry)
+        return dict(response_object, headers={**headers, **set_cookie})
+
+    async def store(
+            self,
+            key: Tuple,
+            response_object: dict,
+            vary_request: Optional[dict],
+            previous: Optional[CacheEntry] = None,
+            now: Optional[float] = None
+    ) -> bool:
+        """
+        Store a response if its status and headers allow it.
+        :param key: Cache key of the request.
+        :param response_object: The tls-client response object.
+        :param vary_request: The request payload, used for the Vary headers. None reuses those of ``previous``.
+        :param previous: The entry being refreshed after a revalidation.
+        :param now: Current unix time, defaults to time.time().
+        :return: Whether the response was stored.
+        """
+        if response_object.get("status") not in self.cacheable_statuses:
+            return False
+        headers = response_object.get("headers") or {}
+        directives = parse_cache_control(_header(headers, "cache-control"))
+        vary = _header(headers, "vary")
+        if "no-store" in directives or (vary is not None and "*" in vary):
+            return False
+
+        now = time.time() if now is None else now
+        expires_at = self._expires_at(headers, directives, now)
+        validators = _header(headers, "etag") is not None or _header(headers, "last-modified") is not None
+        if expires_at <= now and not validators:
+            # never fresh and nothing to revalidate with
+            return False
+
+        if vary_request is None:
+            vary_items = previous.vary if previous is not None else ()
+        else:
+            names = sorted({name.strip().lower() for name in (vary or "").split(",") if name.strip()})
+            if any(
+                name not in names and _request_header(vary_request, name) is not None for name in CREDENTIAL_HEADERS
+            ):
+                # the response may be personalized, reusing it for a request without the same credentials would leak it
+                return False
+            vary_items = tuple((name, _request_header(vary_request, name)) for name in names)
+
+        stored = {
+            name: value for name, value in response_object.items() if name not in ("id", "sessionId", "cookies")
+        }
+        stored["headers"] = {
+            name: values for name, values in headers.items() if name.lower() not in ("set-cookie", "set-cookie2")
+        }
+        size = _entry_size(stored)
+        if size > self.max_size:
+            return False
+
+        self._stats["stored"] += 1
+        await self._spill(self._remember(key, CacheEntry(stored, now, expires_at, vary_items, size)))
+        return True
+
+    @staticmethod
+    def _expires_at(headers: Dict[str, List[str]], directives: Dict[str, Optional[str]], now: float) -> float:
+        if "no-cache" in directives:
+            return now
+        age = _header(headers, "age")
+        age = int(age) if age and age.isdigit() else 0
+        max_age = directives.get("max-age")
+        if max_age is not None:
+            try:
+                return now + int(max_age) - age
+            except ValueError:
+                return now
+        expires = _http_date(_header(headers, "expires"))
+        if expires is not None:
+            date = _http_date(_header(headers, "date"))
+            # measure the lifetime against the server clock, not ours
+            return now + expires - (date if date is not None else now)
+        return now
+
+    def _remember(self, key: Tuple, entry: CacheEntry) -> List[Tuple[Tuple, CacheEntry]]:
+        """Put an entry into the memory tier, returning the entries evicted to make room for it."""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= previous.size
+        self._memory[key] = entry
+        self._memory_size += entry.size
+
+        evicted = []
+        while self._memory_size > self.max_size:
+            evicted_key, evicted_entry = self._memory.popitem(last=False)
+            self._memory_size -= evicted_entry.size
+            evicted.append((evicted_key, evicted_entry))
+        return evicted
+
+    # --- Disk tier ----------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def _file_name(key: Tuple) -> str:
+        return hashlib.sha256(repr(key).encode('utf-8')).hexdigest() + ".json"
+
+    async def _spill(self, evicted: List[Tuple[Tuple, CacheEntry]]) -> None:
+        """Move entries evicted from memory to the disk tier, if there is one."""
+        if self.directory is None:
+            return
+        codec = get_codec()
+        for key, entry in evicted:
+            name = self._file_name(key)
+            data = codec.dumps(entry.to_dict())
+            if len(data) > self.disk_max_size:
+                continue
+            # file I/O stays off the event loop, the index is only touched on it
+            await asyncio.get_event_loop().run_in_executor(None, self._write_file, name, data)
+            self._disk_size -= self._disk.pop(name, 0)
+            self._disk[name] = len(data)
+            self._disk_size += len(data)
+            while self._disk_size > self.disk_max_size:
+                self._remove_file(next(iter(self._disk)))
+
+    def _write_file(self, name: str, data: bytes) -> None:
+        temporary = os.path.join(self.directory, name + ".tmp")
+        with open(temporary, "wb") as file:
+            file.write(data)
+        os.replace(temporary, os.path.join(self.directory, name))
+
+    def _read_file(self, name: str) -> Optional[CacheEntry]:
+        try:
+            with open(os.path.join(self.directory, name), "rb") as file:
+                return CacheEntry.from_dict(get_codec().loads(file.read()))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _remove_file(self, name: str) -> None:
+        self._disk_size -= self._disk.pop(name, 0)
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
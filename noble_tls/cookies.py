@@ -1,9 +1,11 @@
 from noble_tls.utils.structures import CaseInsensitiveDict
 
-from http.cookiejar import CookieJar, Cookie
-from typing import MutableMapping, Union, Any
+from http.cookiejar import CookieJar, Cookie, eff_request_host
+from typing import MutableMapping, Union, Any, List, Optional
 from urllib.parse import urlparse, urlunparse
 from http.client import HTTPMessage
+import ipaddress
+import time
 import copy
 
 try:
@@ -118,15 +120,48 @@ class RequestsCookieJar(CookieJar, MutableMapping):
 
     Unlike a regular CookieJar, this class is pickleable.
 
-    .. warning:: dictionary operations that are normally O(1) may be O(n).
+    Next to ``CookieJar``'s own ``domain -> path -> name`` storage the jar
+    keeps a secondary index of ``name -> (domain, path)``, so lookups by
+    name only touch the cookies sharing that name instead of every cookie
+    in the jar.
     """
 
+    def __init__(self, policy=None):
+        super().__init__(policy)
+        self._name_index = {}  # name -> {(domain, path): None}, the dict is used as an ordered set
+
+    def _index_cookie(self, cookie):
+        self._name_index.setdefault(cookie.name, {})[(cookie.domain, cookie.path)] = None
+
+    def _rebuild_index(self):
+        name_index = {}
+        for domain, paths in self._cookies.items():
+            for path, names in paths.items():
+                for name in names:
+                    name_index.setdefault(name, {})[(domain, path)] = None
+        self._name_index = name_index
+
+    def _find_cookies(self, name, domain=None, path=None):
+        """Returns the cookies called ``name``, optionally restricted to a domain and path, using the name index."""
+        if domain is not None and path is not None:
+            cookie = self._cookies.get(domain, {}).get(path, {}).get(name)
+            return [cookie] if cookie is not None else []
+
+        cookies = []
+        for cookie_domain, cookie_path in list(self._name_index.get(name, ())):
+            if domain is not None and cookie_domain != domain:
+                continue
+            if path is not None and cookie_path != path:
+                continue
+            cookies.append(self._cookies[cookie_domain][cookie_path][name])
+        return cookies
+
     def get(self, name, default=None, domain=None, path=None):
         """Dict-like get() that also supports optional domain and path args in
         order to resolve naming collisions from using one cookie jar over
         multiple domains.
 
-        .. warning:: operation is O(n), not O(1).
+        Only cookies sharing the given name are looked at.
         """
         try:
             return self._find_no_duplicates(name, domain, path)
@@ -256,7 +291,7 @@ class RequestsCookieJar(CookieJar, MutableMapping):
         exception if there are more than one cookie with name. In that case,
         use the more explicit get() method instead.
 
-        .. warning:: operation is O(n), not O(1).
+        Only cookies sharing the given name are looked at.
         """
         return self._find_no_duplicates(name)
 
@@ -280,7 +315,23 @@ class RequestsCookieJar(CookieJar, MutableMapping):
             and cookie.value.endswith('"')
         ):
             cookie.value = cookie.value.replace('\\"', "")
-        return super().set_cookie(cookie, *args, **kwargs)
+        with self._cookies_lock:
+            super().set_cookie(cookie, *args, **kwargs)
+            self._index_cookie(cookie)
+
+    def clear(self, domain=None, path=None, name=None):
+        """Wraps ``cookielib.CookieJar.clear`` to keep the name index in sync."""
+        with self._cookies_lock:
+            super().clear(domain, path, name)
+            if name is None:
+                self._rebuild_index()
+                return
+
+            locations = self._name_index.get(name)
+            if locations is not None:
+                locations.pop((domain, path), None)
+                if not locations:
+                    del self._name_index[name]
 
     def update(self, other):
         """Updates this jar with cookies from another CookieJar or dict-like"""
@@ -302,11 +353,8 @@ class RequestsCookieJar(CookieJar, MutableMapping):
         :param path: (optional) string containing path of cookie
         :return: cookie.value
         """
-        for cookie in iter(self):
-            if cookie.name == name:
-                if domain is None or cookie.domain == domain:
-                    if path is None or cookie.path == path:
-                        return cookie.value
+        for cookie in self._find_cookies(name, domain, path):
+            return cookie.value
 
         raise KeyError(f"name={name!r}, domain={domain!r}, path={path!r}")
 
@@ -323,17 +371,14 @@ class RequestsCookieJar(CookieJar, MutableMapping):
         :return: cookie.value
         """
         toReturn = None
-        for cookie in iter(self):
-            if cookie.name == name:
-                if domain is None or cookie.domain == domain:
-                    if path is None or cookie.path == path:
-                        if toReturn is not None:
-                            # if there are multiple cookies that meet passed in criteria
-                            raise CookieConflictError(
-                                f"There are multiple cookies with name, {name!r}"
-                            )
-                        # we will eventually return this as long as no cookie conflict
-                        toReturn = cookie.value
+        for cookie in self._find_cookies(name, domain, path):
+            if toReturn is not None:
+                # if there are multiple cookies that meet passed in criteria
+                raise CookieConflictError(
+                    f"There are multiple cookies with name, {name!r}"
+                )
+            # we will eventually return this as long as no cookie conflict
+            toReturn = cookie.value
 
         if toReturn:
             return toReturn
@@ -351,6 +396,8 @@ class RequestsCookieJar(CookieJar, MutableMapping):
         self.__dict__.update(state)
         if "_cookies_lock" not in self.__dict__:
             self._cookies_lock = threading.RLock()
+        if "_name_index" not in self.__dict__:
+            self._rebuild_index()
 
     def copy(self):
         """Return a copy of this RequestsCookieJar."""
@@ -366,6 +413,11 @@ class RequestsCookieJar(CookieJar, MutableMapping):
 
 def remove_cookie_by_name(cookiejar: RequestsCookieJar, name: str, domain: str = None, path: str = None):
     """Removes a cookie by name, by default over all domains and paths."""
+    if isinstance(cookiejar, RequestsCookieJar):
+        for cookie in cookiejar._find_cookies(name, domain, path):
+            cookiejar.clear(cookie.domain, cookie.path, cookie.name)
+        return
+
     clearances = []
     for cookie in cookiejar:
         if cookie.name != name:
@@ -424,8 +476,13 @@ def cookiejar_from_dict(cookie_dict: dict) -> RequestsCookieJar:
 
 def merge_cookies(cookiejar: RequestsCookieJar, cookies: Union[dict, RequestsCookieJar]) -> RequestsCookieJar:
     """Merge cookies in session and cookies provided in request"""
+    if not cookies:
+        return cookiejar
+
     if type(cookies) is dict:
-        cookies = cookiejar_from_dict(cookies)
+        for name, value in cookies.items():
+            cookiejar.set_cookie(create_cookie(name=name, value=value))
+        return cookiejar
 
     for cookie in cookies:
         cookiejar.set_cookie(cookie)
@@ -433,6 +490,70 @@ def merge_cookies(cookiejar: RequestsCookieJar, cookies: Union[dict, RequestsCoo
     return cookiejar
 
 
+def _candidate_domains(host: str, effective_host: str) -> List[str]:
+    """Domains under which the jar may store cookies that apply to ``host``, both host names as cookielib's
+    ``eff_request_host`` returns them."""
+    if effective_host != host:
+        # cookielib stores cookies of dotless hosts, IPv6 literals included, under "<host>.local"
+        return [host, effective_host, f".{effective_host}"]
+
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        pass
+    else:
+        return [host]
+
+    domains = []
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        suffix = ".".join(labels[i:])
+        domains.append(suffix)
+        domains.append(f".{suffix}")
+    return domains
+
+
+def _path_matches(request_path: str, cookie_path: str) -> bool:
+    if not cookie_path or cookie_path == "/" or request_path == cookie_path:
+        return True
+    if not request_path.startswith(cookie_path):
+        return False
+    return cookie_path.endswith("/") or request_path[len(cookie_path)] == "/"
+
+
+def cookies_for_url(cookie_jar: CookieJar, url: str, now: Optional[float] = None) -> List[Cookie]:
+    """Returns the cookies in the jar that apply to ``url``.
+
+    Only the jar's buckets for the request host and its parent domains are
+    looked at. Cookies without a domain (e.g. passed as a plain dict) always
+    apply. The path and secure flag have to match, and expired cookies are
+    skipped and removed from the jar.
+    """
+    parsed = urlparse(url)
+    # the same host form cookielib files cookies under, e.g. "[::1]" rather than "::1"
+    host, effective_host = eff_request_host(MockRequest(url, CaseInsensitiveDict()))
+    request_path = parsed.path or "/"
+    is_secure = parsed.scheme in ("https", "wss")
+    now = int(time.time()) if now is None else now
+
+    cookies = []
+    expired = []
+    with cookie_jar._cookies_lock:
+        for domain in ("", *_candidate_domains(host, effective_host)):
+            for cookie_path, names in cookie_jar._cookies.get(domain, {}).items():
+                if not _path_matches(request_path, cookie_path):
+                    continue
+                for cookie in names.values():
+                    if cookie.is_expired(now):
+                        expired.append(cookie)
+                    elif is_secure or not cookie.secure:
+                        cookies.append(cookie)
+
+        for cookie in expired:
+            cookie_jar.clear(cookie.domain, cookie.path, cookie.name)
+    return cookies
+
+
 def get_cookie_header(request_url: str, request_headers: CaseInsensitiveDict, cookie_jar: RequestsCookieJar) -> str:
     r = MockRequest(request_url, request_headers)
     cookie_jar.add_cookie_header(r)
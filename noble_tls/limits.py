@@ -0,0 +1,389 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple, Type
+
+from .exceptions.exceptions import TLSClientException
+
+
+class HostGate:
+    """
+    Async counting gate with a limit that can be changed while requests are waiting.
+    Waiters are admitted in FIFO order. A limit of None admits everybody.
+    """
+
+    __slots__ = ("limit", "in_flight", "_waiters")
+
+    def __init__(self, limit: Optional[int] = None) -> None:
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _has_room(self) -> bool:
+        return self.limit is None or self.in_flight < self.limit
+
+    async def acquire(self) -> None:
+        if self._has_room() and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was granted right before the cancellation, hand it on
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self.wake()
+
+    def wake(self) -> None:
+        """Admit waiters while there is room, call after raising the limit."""
+        while self._waiters and self._has_room():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # the slot is taken on behalf of the waiter
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: allows ``rate`` acquisitions per second on average, with bursts of up to ``burst``.
+    Callers reserve a token up front and sleep until it is due, so waiters are served in order.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def full_at(self) -> float:
+        """Monotonic time at which the bucket is full again."""
+        self._refill()
+        return self.updated + max(0.0, self.burst - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        self._refill()
+        self.tokens -= 1
+        if self.tokens < 0:
+            try:
+                await asyncio.sleep(-self.tokens / self.rate)
+            except asyncio.CancelledError:
+                # the request never went out, give the reserved token back so later waiters are not delayed by it
+                self.tokens += 1
+                raise
+
+
+class HostLimiter:
+    """
+    Per-host concurrency limits and rate limits for Session requests.
+
+    Requests wait on the event loop for a free slot and a rate limit token before they are handed to the FFI worker
+    pool, so throttled requests never sit in a worker thread. ``per_host`` overrides the defaults for single hosts,
+    e.g. ``{"api.example.com": {"max_in_flight": 4, "rate": 2.0}}``.
+
+    Example:
+        session = Session(client=Client.CHROME_120, limiter=HostLimiter(max_in_flight=8, rate=10.0))
+    """
+
+    def __init__(
+            self,
+            max_in_flight: Optional[int] = None,
+            rate: Optional[float] = None,
+            burst: Optional[float] = None,
+            per_host: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> None:
+        """
+        :param max_in_flight: Maximum number of requests per host in flight at once, None for no limit.
+        :param rate: Maximum number of requests per host per second, None for no limit.
+        :param burst: Number of requests a host may receive at once before ``rate`` kicks in, defaults to ``rate``.
+        :param per_host: Overrides of max_in_flight, rate and burst by host name.
+        """
+        self.max_in_flight = max_in_flight
+        self.rate = rate
+        self.burst = burst
+        self.per_host = {host.lower(): settings for host, settings in (per_host or {}).items()}
+
+        self._gates: Dict[str, HostGate] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        # idle hosts whose bucket is still refilling, by the monotonic time it is full again, oldest first
+        self._idle: "OrderedDict[str, float]" = OrderedDict()
+
+    def _setting(self, host: str, name: str):
+        settings = self.per_host.get(host)
+        if settings is not None and name in settings:
+            return settings[name]
+        return getattr(self, name)
+
+    def _gate(self, host: str) -> HostGate:
+        gate = self._gates.get(host)
+        if gate is None:
+            gate = self._gates[host] = HostGate(self._setting(host, "max_in_flight"))
+        return gate
+
+    def _bucket(self, host: str) -> Optional[TokenBucket]:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate = self._setting(host, "rate")
+            if rate is None:
+                return None
+            bucket = self._buckets[host] = TokenBucket(rate, self._setting(host, "burst"))
+        return bucket
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        """Waits for a free slot and a rate limit token for ``host``, the slot is held for the ``async with`` block."""
+        host = host.lower()
+        self._idle.pop(host, None)
+        self._sweep_idle()
+        gate = self._gate(host)
+        await gate.acquire()
+        try:
+            bucket = self._bucket(host)
+            if bucket is not None:
+                await bucket.acquire()
+            yield
+        finally:
+            gate.release()
+            self._forget_if_idle(host, gate)
+
+    def observe(
+            self,
+            host: str,
+            latency: float,
+            status: Optional[int] = None,
+            error: Optional[BaseException] = None
+    ) -> None:
+        """Called by the Session after every request with its outcome. Adaptive limiters override this."""
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Current state of every host with requests in flight or waiting.
+        :return: Dictionary by host with the limit, the number of requests in flight and the number waiting.
+        """
+        return {
+            host: {"limit": gate.limit, "in_flight": gate.in_flight, "waiting": gate.waiting}
+            for host, gate in self._gates.items()
+        }
+
+    def _forget_if_idle(self, host: str, gate: HostGate) -> None:
+        # hosts without activity are dropped, so crawling many hosts does not grow the limiter forever
+        if gate.in_flight or gate.waiting or host in self.per_host:
+            return
+        bucket = self._buckets.get(host)
+        if bucket is not None and bucket.full_at > time.monotonic():
+            # forgetting the bucket now would hand out a fresh burst, drop it once it refilled instead
+            self._idle[host] = bucket.full_at
+            return
+        self._gates.pop(host, None)
+        self._buckets.pop(host, None)
+
+    def _sweep_idle(self) -> None:
+        """Drop idle hosts whose bucket refilled in the meantime."""
+        now = time.monotonic()
+        while self._idle:
+            host, full_at = next(iter(self._idle.items()))
+            if full_at > now:
+                # hosts share the same rate unless overridden, so later entries are mostly not due either
+                return
+            del self._idle[host]
+            self._gates.pop(host, None)
+            self._buckets.pop(host, None)
+
+
+class HostState:
+    """Adaptive limit and health of one host, see AdaptiveLimiter."""
+
+    __slots__ = ("limit", "latency", "baseline", "error_rate", "last_decrease", "increases", "decreases")
+
+    def __init__(self, limit: float) -> None:
+        self.limit = limit
+        self.latency: Optional[float] = None  # moving average of successful requests
+        self.baseline: Optional[float] = None  # lowest latency seen, drifting up slowly
+        self.error_rate = 0.0
+        self.last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+
+
+class AdaptiveLimiter(HostLimiter):
+    """
+    HostLimiter whose per-host concurrency limits adapt to the target (additive increase, multiplicative decrease).
+
+    Every successful request that used up the host's limit raises it by ``increase / limit``, i.e. by about
+    ``increase`` per round of requests, as long as its latency stays within ``latency_tolerance`` times the lowest
+    latency seen and the error rate stays below ``max_error_rate``. Responses with a status in ``backoff_statuses``,
+    tls-client errors (status 0, which includes timeouts) and ``backoff_errors`` multiply the limit by ``backoff``, at
+    most once per average round trip so one burst of failures is not punished several times.
+
+    Example:
+        limiter = AdaptiveLimiter(initial_limit=4, max_limit=128)
+        session = Session(client=Client.CHROME_120, limiter=limiter)
+        ...
+        print(limiter.limits())
+    """
+
+    LATENCY_ALPHA = 0.2
+    ERROR_RATE_ALPHA = 0.1
+    BASELINE_DRIFT = 0.01
+
+    def __init__(
+            self,
+            initial_limit: int = 4,
+            min_limit: int = 1,
+            max_limit: Optional[int] = 256,
+            increase: float = 1.0,
+            backoff: float = 0.5,
+            latency_tolerance: float = 2.0,
+            max_error_rate: float = 0.05,
+            backoff_statuses: Tuple[int, ...] = (429, 503),
+            backoff_errors: Tuple[Type[BaseException], ...] = (TLSClientException, asyncio.TimeoutError, TimeoutError),
+            rate: Optional[float] = None,
+            burst: Optional[float] = None,
+            per_host: Optional[Dict[str, Dict[str, Any]]] = None,
+            max_tracked_hosts: int = 10_000
+    ) -> None:
+        """
+        :param initial_limit: Concurrency limit every host starts with.
+        :param min_limit: Lowest limit a host is backed off to.
+        :param max_limit: Highest limit a host is raised to, None for no cap. ``max_in_flight`` in ``per_host``
+            overrides it for single hosts.
+        :param increase: Additive increase, roughly per round of requests.
+        :param backoff: Factor the limit is multiplied with on overload, between 0 and 1.
+        :param latency_tolerance: Latencies up to this multiple of the lowest latency seen count as healthy.
+        :param max_error_rate: Error rate (moving average) up to which the limit is still raised.
+        :param backoff_statuses: Response status codes that signal overload.
+        :param backoff_errors: Exception classes that signal overload.
+        :param rate: Maximum number of requests per host per second, None for no limit.
+        :param burst: Number of requests a host may receive at once before ``rate`` kicks in, defaults to ``rate``.
+        :param per_host: Overrides of max_in_flight (the host's max_limit), rate and burst by host name.
+        :param max_tracked_hosts: Number of recently used hosts whose limits are remembered.
+        """
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        if min_limit < 1 or initial_limit < min_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit")
+
+        super().__init__(max_in_flight=max_limit, rate=rate, burst=burst, per_host=per_host)
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.backoff_statuses = frozenset(backoff_statuses)
+        self.backoff_errors = backoff_errors
+        self.max_tracked_hosts = max_tracked_hosts
+
+        self._states: "OrderedDict[str, HostState]" = OrderedDict()
+
+    def _state(self, host: str) -> HostState:
+        state = self._states.get(host)
+        if state is None:
+            state = self._states[host] = HostState(self._clamp(host, self.initial_limit))
+            if len(self._states) > self.max_tracked_hosts:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(host)
+        return state
+
+    def _clamp(self, host: str, limit: float) -> float:
+        max_limit = self._setting(host, "max_in_flight")
+        if max_limit is not None:
+            limit = min(limit, max_limit)
+        return max(self.min_limit, limit)
+
+    def _gate(self, host: str) -> HostGate:
+        gate = self._gates.get(host)
+        if gate is None:
+            gate = self._gates[host] = HostGate(math.floor(self._state(host).limit))
+        return gate
+
+    def observe(
+            self,
+            host: str,
+            latency: float,
+            status: Optional[int] = None,
+            error: Optional[BaseException] = None
+    ) -> None:
+        host = host.lower()
+        state = self._state(host)
+        overloaded = status == 0 or status in self.backoff_statuses or isinstance(error, self.backoff_errors)
+        failed = overloaded or error is not None
+        state.error_rate += self.ERROR_RATE_ALPHA * (failed - state.error_rate)
+
+        if overloaded:
+            now = time.monotonic()
+            if now - state.last_decrease >= (state.latency or 0.0):
+                state.limit = self._clamp(host, state.limit * self.backoff)
+                state.last_decrease = now
+                state.decreases += 1
+                self._apply(host, state)
+            return
+        if failed:
+            return
+
+        if state.latency is None:
+            state.latency = state.baseline = latency
+        else:
+            state.latency += self.LATENCY_ALPHA * (latency - state.latency)
+            state.baseline = min(latency, state.baseline + self.BASELINE_DRIFT * (latency - state.baseline))
+
+        gate = self._gates.get(host)
+        saturated = gate is not None and gate.in_flight >= gate.limit
+        healthy = latency <= self.latency_tolerance * state.baseline and state.error_rate <= self.max_error_rate
+        if saturated and healthy:
+            # only raise the limit while it is actually what holds requests back
+            state.limit = self._clamp(host, state.limit + self.increase / state.limit)
+            state.increases += 1
+            self._apply(host, state)
+
+    def _apply(self, host: str, state: HostState) -> None:
+        gate = self._gates.get(host)
+        if gate is not None:
+            gate.limit = math.floor(state.limit)
+            gate.wake()
+
+    def limits(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Current adaptive state of every tracked host, meant for metrics.
+        :return: Dictionary by host with the current limit, the requests in flight and waiting, the average latency
+            in seconds, the error rate and how often the limit was raised and lowered.
+        """
+        limits = {}
+        for host, state in self._states.items():
+            gate = self._gates.get(host)
+            limits[host] = {
+                "limit": math.floor(state.limit),
+                "in_flight": gate.in_flight if gate else 0,
+                "waiting": gate.waiting if gate else 0,
+                "latency": state.latency,
+                "error_rate": state.error_rate,
+                "increases": state.increases,
+                "decreases": state.decreases,
+            }
+        return limits
@@ -0,0 +1,93 @@
+import asyncio
+import mimetypes
+import os
+import uuid
+from typing import Any, AsyncIterator, Iterable, Mapping, Optional, Tuple, Union
+
+from .utils.body import BODY_CHUNK_SIZE
+
+
+class MultipartEncoder:
+    """
+    multipart/form-data request body that reads its files in chunks as it is sent, instead of building the whole
+    body in memory first. Pass it as ``data``, the Content-Type header with the boundary is set automatically.
+
+    Field values are strings or bytes. File fields are tuples of ``(filename, source)``, optionally followed by the
+    content type and a dict of extra part headers. ``source`` is bytes, a string, an open binary file or an
+    ``os.PathLike`` path, which is opened when the body is read and closed afterwards.
+
+    Example:
+        body = MultipartEncoder({
+            "description": "nightly build",
+            "artifact": ("build.tar.gz", pathlib.Path("/tmp/build.tar.gz"), "application/gzip"),
+        })
+        res = await session.post("https://www.example.com/upload", data=body)
+    """
+
+    def __init__(
+            self,
+            fields: Union[Mapping[str, Any], Iterable[Tuple[str, Any]]],
+            boundary: Optional[str] = None,
+            chunk_size: int = BODY_CHUNK_SIZE
+    ) -> None:
+        """
+        :param fields: Form fields by name, or (name, value) pairs to repeat a name.
+        :param boundary: Boundary between the parts, a random one by default.
+        :param chunk_size: Number of bytes read from a file at a time.
+        """
+        self.fields = list(fields.items() if isinstance(fields, Mapping) else fields)
+        self.boundary = boundary or uuid.uuid4().hex
+        self.chunk_size = chunk_size
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _part_header(self, name: str, value: Any) -> bytes:
+        disposition = f'form-data; name="{_quote(name)}"'
+        headers = {}
+        if isinstance(value, tuple):
+            filename = value[0]
+            content_type = value[2] if len(value) > 2 and value[2] else None
+            if filename is not None:
+                disposition += f'; filename="{_quote(filename)}"'
+                content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            if content_type:
+                headers["Content-Type"] = content_type
+            if len(value) > 3 and value[3]:
+                headers.update(value[3])
+
+        lines = [f"--{self.boundary}", f"Content-Disposition: {disposition}"]
+        lines.extend(f"{header}: {header_value}" for header, header_value in headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode('utf-8')
+
+    async def _read_source(self, source: Any) -> AsyncIterator[bytes]:
+        if isinstance(source, str):
+            yield source.encode('utf-8')
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            yield bytes(source)
+        else:
+            loop = asyncio.get_event_loop()
+            opened = isinstance(source, os.PathLike)
+            file = await loop.run_in_executor(None, open, source, "rb") if opened else source
+            try:
+                while True:
+                    chunk = await loop.run_in_executor(None, file.read, self.chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+            finally:
+                if opened:
+                    file.close()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for name, value in self.fields:
+            yield self._part_header(name, value)
+            async for chunk in self._read_source(value[1] if isinstance(value, tuple) else value):
+                yield chunk
+            yield b"\r\n"
+        yield f"--{self.boundary}--\r\n".encode('utf-8')
+
+
+def _quote(value: str) -> str:
+    return value.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
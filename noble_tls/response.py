@@ -1,33 +1,134 @@
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, AsyncIterator, Iterator
+import asyncio
+import binascii
+import io
 import json
+import os
+import weakref
 from .cookies import cookiejar_from_dict
-from noble_tls.utils.structures import CaseInsensitiveDict
+from noble_tls.utils.structures import CompactHeaders
+from noble_tls.utils.json_codec import get_codec
+from noble_tls.utils.json_stream import iter_items
 from typing import Optional
 from requests.exceptions import HTTPError
 
 
 class Response:
-    """Represents the response to an HTTP request."""
+    """Represents the response to an HTTP request.
+    Slotted so large batches of responses can be kept in memory without a per-instance ``__dict__``."""
+
+    __slots__ = (
+        "url", "status_code", "history",
+        "_text", "_raw_headers", "_headers", "_cookies", "_content", "_content_consumed",
+        "_stream_path", "_stream_finalizer", "__weakref__",
+    )
 
     def __init__(self):
         self.url: Optional[str] = None
         self.status_code: Optional[int] = None  # The HTTP status code.
-        self.text: Optional[str] = None  # The text content of the response.
-        self.headers: CaseInsensitiveDict = CaseInsensitiveDict()  # Case-insensitive response headers.
-        self.cookies = cookiejar_from_dict({})  # Cookies sent back by the server.
+        self._text: Optional[str] = None  # The text content of the response.
+        self._raw_headers: Optional[Dict[str, list]] = None  # Response headers as returned by tls-client.
+        self._headers: Optional[CompactHeaders] = None  # Case-insensitive response headers, built on access.
+        self._cookies = None  # Cookies sent back by the server, an empty jar is only created on access.
         self._content: Optional[bytes] = None  # The byte content of the response.
         self._content_consumed: bool = False  # Tracks if the content has been consumed.
+        self._stream_path: Optional[str] = None  # File tls-client wrote the body to, for streamed responses.
+        self._stream_finalizer = None  # Removes a temporary body file once the response is garbage collected.
         self.history = []
 
     def __enter__(self):
         return self
 
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def __repr__(self):
         return f"<Response [{self.status_code}]>"
 
+    @property
+    def headers(self) -> CompactHeaders:
+        """Case-insensitive response headers, built from the raw tls-client headers on first access."""
+        if self._headers is None:
+            # Single values are not wrapped in a list, the raw headers are dropped once converted.
+            self._headers = CompactHeaders.from_lists(self._raw_headers or {})
+            self._raw_headers = None
+        return self._headers
+
+    @headers.setter
+    def headers(self, value):
+        self._headers = value if isinstance(value, CompactHeaders) else CompactHeaders(value)
+        self._raw_headers = None
+
+    @property
+    def cookies(self):
+        """Cookies sent back by the server."""
+        if self._cookies is None:
+            self._cookies = cookiejar_from_dict({})
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value):
+        self._cookies = value
+
+    @property
+    def text(self) -> Optional[str]:
+        """The text content of the response, decoded lazily from ``content`` for binary responses."""
+        if self._text is None and (self._content is not None or self._stream_path is not None):
+            self._text = self.content.decode(self._charset(), errors="replace")
+        return self._text
+
+    @text.setter
+    def text(self, value: Optional[str]):
+        self._text = value
+
+    def _charset(self) -> str:
+        content_type = self.headers.get("Content-Type") or ""
+        if isinstance(content_type, list):
+            content_type = content_type[0]
+        for param in content_type.split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "charset" and value:
+                return value.strip('"\'')
+        return "utf-8"
+
     def json(self, **kwargs) -> Union[Dict, list]:
-        """Parses the text content of the response to JSON."""
-        return json.loads(self.text, **kwargs)
+        """Parses the content of the response to JSON.
+        Uses the process-wide JSON codec, keyword arguments are passed to the stdlib ``json.loads`` instead.
+        Byte and streamed responses are parsed straight from their bytes, without producing ``text``."""
+        loads = (lambda data: json.loads(data, **kwargs)) if kwargs else get_codec().loads
+        if self._text is None and self._charset().lower().replace("-", "") in ("utf8", "utf8sig"):
+            if self._content is not None:
+                return loads(self._content)
+            if self._stream_path is not None:
+                with open(self._stream_path, "rb") as file:
+                    return loads(file.read())
+        return loads(self.text)
+
+    def iter_json_items(self, prefix: str = "item", chunk_size: int = 64 * 1024) -> Iterator[Any]:
+        """
+        Parse the JSON body incrementally, yielding the values at ``prefix`` one at a time.
+        Streamed responses are read from disk chunk by chunk, so a large export can be processed with bounded memory.
+
+        Example:
+            response = await session.get("https://www.example.com/export.json", stream=True)
+            for record in response.iter_json_items("data.records.item"):
+                ...
+
+        :param prefix: ijson-style path, e.g. "item" for the elements of a top-level array or "data.records.item" for
+            the elements of the array at data.records. ijson is used when it is installed.
+        :param chunk_size: Number of bytes read at a time.
+        """
+        if self._stream_path is not None and self._content is None:
+            with open(self._stream_path, "rb") as file:
+                yield from iter_items(file, prefix, chunk_size)
+            return
+        yield from iter_items(io.BytesIO(self.content), prefix, chunk_size)
 
     def raise_for_status(self):
         """Raises an HTTPError if the HTTP request returned an unsuccessful status code."""
@@ -38,8 +139,13 @@ class Response:
 
     @property
     def content(self) -> bytes:
-        """Lazily loads the content of the response, in bytes."""
+        """Lazily loads the content of the response, in bytes.
+        For streamed responses this reads the whole body file into memory, prefer ``iter_content`` for large ones."""
         if self._content is None:
+            if self._stream_path is not None:
+                with open(self._stream_path, "rb") as file:
+                    self._content = file.read()
+                return self._content
             if self._content_consumed:
                 raise RuntimeError("The content for this response was already consumed.")
             self._content = self.text.encode() if self.status_code != 0 else b""
@@ -47,18 +153,96 @@ class Response:
         return self._content
 
 
-def build_response(res: Dict[str, Any], res_cookies) -> Response:
-    """Builds and returns a Response object from given data."""
+    @property
+    def stream_path(self) -> Optional[str]:
+        """The file the body of a streamed response was written to, None for regular responses."""
+        return self._stream_path
+
+    def attach_stream(self, path: str, temporary: bool) -> None:
+        """Make the response read its body from ``path``, deleting the file on ``close`` if it is ``temporary``."""
+        self._stream_path = path
+        self._text = None
+        self._content = None
+        self._content_consumed = False
+        if temporary:
+            self._stream_finalizer = weakref.finalize(self, _remove_file, path)
+
+    def iter_content(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        Iterate over the body in chunks, streamed responses are read from disk without loading the whole body.
+        :param chunk_size: Maximum size of a chunk in bytes.
+        """
+        if self._stream_path is None or self._content is not None:
+            content = self.content
+            for start in range(0, len(content), chunk_size):
+                yield content[start:start + chunk_size]
+            return
+
+        with open(self._stream_path, "rb") as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    async def aiter_bytes(self, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """
+        Like ``iter_content``, but reads streamed bodies in the default executor so the event loop is not blocked.
+        :param chunk_size: Maximum size of a chunk in bytes.
+        """
+        if self._stream_path is None or self._content is not None:
+            for chunk in self.iter_content(chunk_size):
+                yield chunk
+            return
+
+        loop = asyncio.get_event_loop()
+        file = await loop.run_in_executor(None, open, self._stream_path, "rb")
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, file.read, chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            file.close()
+
+    def close(self) -> None:
+        """Delete the temporary body file of a streamed response. Files written by ``Session.download_to`` are kept."""
+        if self._stream_finalizer is not None:
+            self._stream_finalizer()
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def decode_byte_body(body: str) -> bytes:
+    """Decodes the ``data:<mime>;base64,<data>`` body tls-client returns for byte responses."""
+    if body.startswith("data:"):
+        body = body[body.index(",") + 1:]
+    return binascii.a2b_base64(body)
+
+
+def build_response(res: Dict[str, Any], res_cookies, is_byte_response: bool = False) -> Response:
+    """Builds and returns a Response object from given data.
+    Headers and cookies are materialized on first access. For byte responses the base64 body is decoded once into
+    ``content``, ``text`` is only derived on access."""
     response = Response()
     response.url = res.get("target")  # Extract the target URL from the response data.
     response.status_code = res.get("status", 0)  # Default to 0 if status is not provided.
-    response.text = res.get("body", "")  # Default to empty string if body is not provided.
+    if is_byte_response:
+        body = res.get("body", "")
+        # large bodies were already decoded on the worker thread, see request_response
+        response._content = body if isinstance(body, bytes) else decode_byte_body(body)
+        response._content_consumed = True
+    else:
+        response.text = res.get("body", "")  # Default to empty string if body is not provided.
 
-    # Process headers, ensuring single values are not wrapped in a list.
-    response_headers = CaseInsensitiveDict()
-    for key, value in res.get("headers", {}).items():
-        response_headers[key] = value[0] if len(value) == 1 else value
-    response.headers = response_headers
+    # Headers are only turned into CompactHeaders when they are accessed.
+    response._raw_headers = res.get("headers") or {}
 
-    response.cookies = res_cookies  # Assign the provided cookies to the response.
+    response.cookies = res_cookies  # Assign the provided cookies to the response, None creates an empty jar lazily.
     return response
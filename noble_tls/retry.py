@@ -0,0 +1,201 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
+
+from .exceptions.exceptions import TLSClientException
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of the requests sent, so retries cannot multiply the load on a target that is down.
+
+    Every request deposits ``ratio`` tokens (up to ``max_tokens``) and every retry withdraws one. On top of that
+    ``min_retries_per_second`` tokens trickle in, so a low-traffic client can still retry now and then. Share one
+    budget between all sessions that talk to the same targets; by default every RetryPolicy uses the process-wide
+    budget from ``get_retry_budget``.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 1.0, max_tokens: float = 100.0) -> None:
+        """
+        :param ratio: Retries allowed per request sent, e.g. 0.2 allows one retry per five requests.
+        :param min_retries_per_second: Retries allowed per second regardless of the traffic.
+        :param max_tokens: Maximum number of retries that can be saved up.
+        """
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+
+        self.tokens = max_tokens
+        self._updated = time.monotonic()
+        self._stats = {"deposits": 0, "retries": 0, "exhausted": 0}
+
+    def _refill(self, amount: float = 0.0) -> None:
+        now = time.monotonic()
+        amount += (now - self._updated) * self.min_retries_per_second
+        self.tokens = min(self.max_tokens, self.tokens + amount)
+        self._updated = now
+
+    def deposit(self) -> None:
+        """Record a request, called once per request before any retries."""
+        self._refill(self.ratio)
+        self._stats["deposits"] += 1
+
+    def withdraw(self) -> bool:
+        """
+        Take a token for a retry.
+        :return: Whether the retry is allowed.
+        """
+        self._refill()
+        if self.tokens < 1:
+            self._stats["exhausted"] += 1
+            return False
+        self.tokens -= 1
+        self._stats["retries"] += 1
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Snapshot of the budget counters.
+        :return: Dictionary with the number of requests deposited, retries allowed, retries denied and the tokens left.
+        """
+        self._refill()
+        stats: Dict[str, float] = dict(self._stats)
+        stats["tokens"] = self.tokens
+        return stats
+
+
+_budget: Optional[RetryBudget] = None
+
+
+def get_retry_budget() -> RetryBudget:
+    """
+    Return the process-wide retry budget, creating it on first use.
+    :return: The RetryBudget shared by every RetryPolicy without a budget of its own.
+    """
+    global _budget
+    if _budget is None:
+        _budget = RetryBudget()
+    return _budget
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+    :param value: Header value, either delay-seconds or an HTTP date.
+    :param now: Current unix time, defaults to time.time().
+    :return: Seconds to wait, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class RetryPolicy:
+    """
+    Decides which failed requests a Session retries and how long it waits before doing so.
+
+    Only idempotent methods are retried, on the statuses in ``statuses`` and the exceptions in ``exceptions``.
+    The wait before retry n (starting at 0) is drawn uniformly from 0 to ``min(max_backoff, backoff_base * 2 ** n)``
+    (exponential backoff with full jitter), unless the response carries a Retry-After header, which is honoured up to
+    ``max_retry_after`` seconds. Every retry has to be granted by the retry budget.
+
+    Example:
+        session = Session(client=Client.CHROME_120, retry=RetryPolicy(total=3, backoff_base=0.2))
+    """
+
+    def __init__(
+            self,
+            total: int = 3,
+            statuses: Iterable[int] = RETRY_STATUS_CODES,
+            exceptions: Tuple[Type[BaseException], ...] = (TLSClientException, asyncio.TimeoutError),
+            methods: Iterable[str] = IDEMPOTENT_METHODS,
+            backoff_base: float = 0.1,
+            max_backoff: float = 10.0,
+            respect_retry_after: bool = True,
+            max_retry_after: float = 60.0,
+            budget: Optional[RetryBudget] = None
+    ) -> None:
+        """
+        :param total: Maximum number of retries per request.
+        :param statuses: Response status codes that are retried.
+        :param exceptions: Exception classes that are retried.
+        :param methods: Request methods that are retried.
+        :param backoff_base: Upper bound of the first wait in seconds, doubled with every retry.
+        :param max_backoff: Upper bound of any wait in seconds.
+        :param respect_retry_after: Wait as long as the Retry-After header of a response asks for.
+        :param max_retry_after: Responses asking for a longer wait than this many seconds are not retried.
+        :param budget: Retry budget, None uses the process-wide budget.
+        """
+        self.total = total
+        self.statuses = frozenset(statuses)
+        self.exceptions = exceptions
+        self.methods = frozenset(method.upper() for method in methods)
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self._budget = budget
+
+    @property
+    def budget(self) -> RetryBudget:
+        return self._budget or get_retry_budget()
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Jittered wait before a retry.
+        :param attempt: Number of retries already made.
+        :return: Seconds to wait.
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_base * 2 ** attempt))
+
+    def next_delay(
+            self,
+            method: str,
+            attempt: int,
+            response: Any = None,
+            error: Optional[BaseException] = None
+    ) -> Optional[float]:
+        """
+        Decide whether a request is retried.
+        :param method: Request method.
+        :param attempt: Number of retries already made.
+        :param response: The response, if one was received.
+        :param error: The exception the request failed with, if any.
+        :return: Seconds to wait before retrying, or None if the request is not retried.
+        """
+        if attempt >= self.total or method.upper() not in self.methods:
+            return None
+        if error is not None:
+            if not isinstance(error, self.exceptions):
+                return None
+            delay = self.backoff(attempt)
+        elif response is not None and response.status_code in self.statuses:
+            retry_after = None
+            if self.respect_retry_after:
+                value = response.headers.get("Retry-After")
+                if isinstance(value, list):
+                    # the header was sent more than once, go by the first one
+                    value = value[0]
+                retry_after = parse_retry_after(value)
+            if retry_after is not None and retry_after > self.max_retry_after:
+                return None
+            delay = self.backoff(attempt) if retry_after is None else retry_after
+        else:
+            return None
+
+        if not self.budget.withdraw():
+            return None
+        return delay
@@ -0,0 +1,228 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .exceptions.exceptions import TLSClientException
+from .sessions import Session
+from .utils.identifiers import Client
+
+
+class SessionPool:
+    """
+    Hands out warm sessions so requests reuse the TLS connections tls-client already established.
+
+    Sessions are keyed by their fingerprint (client identifier or JA3 string plus any other Session settings) and
+    proxy. A checked-out session is handed back with ``checkin``, or automatically when using ``acquire``. Idle
+    sessions are closed once they have been unused for ``idle_timeout`` seconds, or when their slot is needed for a
+    session with a different key.
+
+    Note that pooled sessions keep their cookies and headers between checkouts.
+
+    Example:
+        async with SessionPool(max_size=32) as pool:
+            async with pool.acquire(client=Client.CHROME_120, proxy="http://user:pass@ip:port") as session:
+                res = await session.get("https://www.example.com/")
+    """
+
+    def __init__(
+            self,
+            max_size: int = 64,
+            idle_timeout: Optional[float] = 300.0,
+            **session_kwargs: Any
+    ) -> None:
+        """
+        :param max_size: Maximum number of sessions, idle and checked out, the pool keeps at once.
+        :param idle_timeout: Seconds after which an idle session is closed, None keeps idle sessions forever.
+        :param session_kwargs: Default keyword arguments for every Session the pool creates.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.session_kwargs = session_kwargs
+
+        self._idle: Dict[Hashable, deque] = {}  # key -> deque of (session, returned at), most recently returned last
+        self._in_use: Dict[Session, Hashable] = {}
+        self._size = 0
+        self._closed = False
+        self._condition = asyncio.Condition()
+        self._stats = {"created": 0, "reused": 0, "evicted": 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Snapshot of the pool counters.
+        :return: Dictionary with the number of sessions created, reused and evicted, and the current pool size.
+        """
+        stats = dict(self._stats)
+        stats["size"] = self._size
+        stats["idle"] = sum(len(sessions) for sessions in self._idle.values())
+        stats["in_use"] = len(self._in_use)
+        return stats
+
+    @asynccontextmanager
+    async def acquire(
+            self,
+            client: Optional[Client] = None,
+            ja3_string: Optional[str] = None,
+            proxy: Optional[str] = None,
+            **session_kwargs: Any
+    ):
+        """Checks out a session for the duration of the ``async with`` block, see ``checkout``."""
+        session = await self.checkout(client=client, ja3_string=ja3_string, proxy=proxy, **session_kwargs)
+        try:
+            yield session
+        finally:
+            await self.checkin(session)
+
+    async def checkout(
+            self,
+            client: Optional[Client] = None,
+            ja3_string: Optional[str] = None,
+            proxy: Optional[str] = None,
+            **session_kwargs: Any
+    ) -> Session:
+        """
+        Take a session out of the pool, creating one if no idle session matches. Waits while the pool is full and
+        every session is checked out.
+        :param client: Client identifier of the session.
+        :param ja3_string: JA3 string of the session, used when no client identifier is given.
+        :param proxy: Proxy URL the session sends its requests through.
+        :param session_kwargs: Further Session settings, they are part of the key as well.
+        :return: A session that has to be handed back with ``checkin``.
+        """
+        session_kwargs = {**self.session_kwargs, **session_kwargs}
+        key = self._key(client, ja3_string, proxy, session_kwargs)
+        to_close = []
+        session = None
+
+        async with self._condition:
+            while True:
+                if self._closed:
+                    raise TLSClientException("SessionPool is closed.")
+
+                to_close.extend(self._expired())
+                idle = self._idle.get(key)
+                if idle:
+                    # the most recently returned session is the most likely to still have live connections
+                    session, _ = idle.pop()
+                    self._stats["reused"] += 1
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                evicted = self._evict_least_recently_used()
+                if evicted is not None:
+                    # the evicted session's slot is taken over by the new one
+                    to_close.append(evicted)
+                    break
+
+                await self._condition.wait()
+
+            if session is None:
+                try:
+                    session = Session(client=client, ja3_string=ja3_string, **session_kwargs)
+                except BaseException:
+                    self._size -= 1
+                    self._condition.notify()
+                    raise
+                if proxy:
+                    session.proxies = {"http": proxy, "https": proxy}
+                self._stats["created"] += 1
+            self._in_use[session] = key
+
+        await self._close_sessions(to_close)
+        return session
+
+    async def checkin(self, session: Session) -> None:
+        """
+        Hand a session back to the pool. Closed sessions, and sessions returned after the pool was closed, are
+        dropped.
+        :param session: A session obtained from ``checkout``.
+        """
+        to_close = []
+        async with self._condition:
+            key = self._in_use.pop(session, None)
+            if key is None:
+                raise ValueError("Session was not checked out from this pool.")
+
+            if self._closed or session.closed:
+                self._size -= 1
+                to_close.append(session)
+            else:
+                self._idle.setdefault(key, deque()).append((session, time.monotonic()))
+            self._condition.notify()
+
+        await self._close_sessions(to_close)
+
+    async def evict_idle(self) -> int:
+        """
+        Close every idle session that exceeded ``idle_timeout``. This also happens on every checkout.
+        :return: The number of sessions closed.
+        """
+        async with self._condition:
+            expired = self._expired()
+        await self._close_sessions(expired)
+        return len(expired)
+
+    async def close(self) -> None:
+        """Close all idle sessions, sessions that are still checked out are closed when they are handed back."""
+        async with self._condition:
+            self._closed = True
+            to_close = [session for sessions in self._idle.values() for session, _ in sessions]
+            self._idle.clear()
+            self._size -= len(to_close)
+            self._condition.notify_all()
+        await self._close_sessions(to_close)
+
+    @staticmethod
+    def _key(client: Optional[Client], ja3_string: Optional[str], proxy: Optional[str], session_kwargs: dict) -> Tuple:
+        fingerprint = client.value if client else ja3_string
+        return fingerprint, proxy or "", repr(sorted(session_kwargs.items()))
+
+    def _expired(self) -> list:
+        # must be called with the condition held
+        if self.idle_timeout is None:
+            return []
+
+        deadline = time.monotonic() - self.idle_timeout
+        expired = []
+        for key in list(self._idle):
+            sessions = self._idle[key]
+            while sessions and sessions[0][1] < deadline:
+                expired.append(sessions.popleft()[0])
+            if not sessions:
+                del self._idle[key]
+        self._size -= len(expired)
+        self._stats["evicted"] += len(expired)
+        return expired
+
+    def _evict_least_recently_used(self) -> Optional[Session]:
+        # must be called with the condition held
+        oldest_key = None
+        for key, sessions in self._idle.items():
+            if sessions and (oldest_key is None or sessions[0][1] < self._idle[oldest_key][0][1]):
+                oldest_key = key
+        if oldest_key is None:
+            return None
+
+        sessions = self._idle[oldest_key]
+        session, _ = sessions.popleft()
+        if not sessions:
+            del self._idle[oldest_key]
+        self._stats["evicted"] += 1
+        return session
+
+    @staticmethod
+    async def _close_sessions(sessions: list) -> None:
+        if sessions:
+            await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
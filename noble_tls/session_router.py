@@ -0,0 +1,176 @@
+import asyncio
+import bisect
+import hashlib
+import math
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from .response import Response
+from .sessions import Session
+
+DEFAULT_PORTS = {"http": 80, "https": 443, "ws": 80, "wss": 443}
+
+
+class SessionRouter:
+    """
+    Spreads requests over several sessions while keeping every origin on the same session.
+
+    Origins, i.e. (scheme, host, port, proxy), are mapped onto the sessions with consistent hashing with bounded
+    loads: an origin goes to the first session clockwise from its hash on the ring, unless that session already has
+    more than ``load_factor`` times the average number of requests in flight, in which case it spills over to the next
+    one. Requests for the same origin therefore share the Go-side connections of one session, making HTTP/2
+    multiplexing and keep-alive effective.
+
+    ``stats`` counts hits (the session already talked to the origin, its connection can be reused) and misses (the
+    session has to open a new connection).
+
+    Example:
+        router = SessionRouter([Session(client=Client.CHROME_120) for _ in range(8)])
+        res = await router.get("https://www.example.com/")
+    """
+
+    def __init__(
+            self,
+            sessions: Sequence[Session],
+            replicas: int = 64,
+            load_factor: float = 1.25,
+            max_tracked_origins: int = 10_000
+    ) -> None:
+        """
+        :param sessions: Sessions to route over.
+        :param replicas: Number of points every session gets on the hash ring.
+        :param load_factor: How far above the average number of in-flight requests a session may go before
+            origins spill over to the next session, must be greater than 1.
+        :param max_tracked_origins: Number of recently used origins remembered per session for the hit/miss stats.
+        """
+        if not sessions:
+            raise ValueError("SessionRouter needs at least one session")
+        if load_factor <= 1:
+            raise ValueError("load_factor must be greater than 1")
+
+        self.sessions: List[Session] = list(sessions)
+        self.load_factor = load_factor
+        self.max_tracked_origins = max_tracked_origins
+
+        ring = sorted(
+            (self._hash(f"{index}-{replica}"), index)
+            for index in range(len(self.sessions))
+            for replica in range(replicas)
+        )
+        self._ring_hashes = [point for point, _ in ring]
+        self._ring_sessions = [index for _, index in ring]
+
+        self._in_flight = [0] * len(self.sessions)
+        self._origins = [OrderedDict() for _ in self.sessions]  # recently used origins per session
+        self._stats = {"hits": 0, "misses": 0, "spills": 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self) -> None:
+        """Close every session of the router."""
+        await asyncio.gather(*(session.close() for session in self.sessions))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the routing counters.
+        :return: Dictionary with hits, misses, spills (origins moved off their preferred session because it was
+            overloaded), the hit ratio and the current number of requests in flight per session.
+        """
+        stats: Dict[str, Any] = dict(self._stats)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / total if total else 0.0
+        stats["in_flight"] = list(self._in_flight)
+        return stats
+
+    def session_for(self, url: str, proxy: Optional[str] = None) -> Session:
+        """
+        The session requests for ``url`` are currently routed to. Does not count towards the stats.
+        :param url: Request URL.
+        :param proxy: Proxy URL the request is sent through, part of the origin.
+        """
+        return self.sessions[self._route(self._origin(url, proxy))[0]]
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> Response:
+        """Sends a request through the session its origin is routed to, see Session.execute_request."""
+        origin = self._origin(url, kwargs.get("proxy"))
+        index, spilled = self._route(origin)
+        self._record(index, origin, spilled)
+
+        self._in_flight[index] += 1
+        try:
+            return await self.sessions[index].execute_request(method=method, url=url, **kwargs)
+        finally:
+            self._in_flight[index] -= 1
+
+    async def get(self, url: str, **kwargs: Any) -> Response:
+        """Sends a GET request"""
+        return await self.request("GET", url, **kwargs)
+
+    async def options(self, url: str, **kwargs: Any) -> Response:
+        """Sends a OPTIONS request"""
+        return await self.request("OPTIONS", url, **kwargs)
+
+    async def head(self, url: str, **kwargs: Any) -> Response:
+        """Sends a HEAD request"""
+        return await self.request("HEAD", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> Response:
+        """Sends a POST request"""
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs: Any) -> Response:
+        """Sends a PUT request"""
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs: Any) -> Response:
+        """Sends a PATCH request"""
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any) -> Response:
+        """Sends a DELETE request"""
+        return await self.request("DELETE", url, **kwargs)
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), "big")
+
+    @staticmethod
+    def _origin(url: str, proxy: Any = None) -> Tuple[str, str, int, str]:
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+        port = parsed.port or DEFAULT_PORTS.get(scheme, 0)
+        if isinstance(proxy, dict):
+            proxy = proxy.get("http")
+        return scheme, (parsed.hostname or "").lower(), port, proxy or ""
+
+    def _route(self, origin: Tuple[str, str, int, str]) -> Tuple[int, bool]:
+        """Returns the session index for an origin and whether it spilled over from its preferred session."""
+        capacity = math.ceil(self.load_factor * (sum(self._in_flight) + 1) / len(self.sessions))
+        start = bisect.bisect(self._ring_hashes, self._hash("|".join(map(str, origin))))
+
+        preferred = None
+        for offset in range(len(self._ring_sessions)):
+            index = self._ring_sessions[(start + offset) % len(self._ring_sessions)]
+            if preferred is None:
+                preferred = index
+            if self._in_flight[index] < capacity:
+                return index, index != preferred
+        return preferred, False
+
+    def _record(self, index: int, origin: Tuple[str, str, int, str], spilled: bool) -> None:
+        origins = self._origins[index]
+        if origin in origins:
+            origins.move_to_end(origin)
+            self._stats["hits"] += 1
+        else:
+            origins[origin] = None
+            if len(origins) > self.max_tracked_origins:
+                origins.popitem(last=False)
+            self._stats["misses"] += 1
+        if spilled:
+            self._stats["spills"] += 1
@@ -1,22 +1,83 @@
 # Builtins
 import asyncio
-from typing import Any, Optional, Union
-from json import dumps, loads
+import queue
+from typing import Any, AsyncIterator, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+from json import dumps
 import urllib.parse
-import base64
-import ctypes
+import weakref
+import time
+import os
+import tempfile
 
-from .c.cffi import request, free_memory
-from .cookies import cookiejar_from_dict, merge_cookies, extract_cookies_to_jar
+from .c.cffi import (
+    request_response,
+    request_batch,
+    destroy_session_by_id,
+    ResponseHandoff,
+    get_worker_pool,
+    FFIWorkerPool,
+    WORKER_DECODE_THRESHOLD
+)
+from .cookies import cookiejar_from_dict, merge_cookies, extract_cookies_to_jar, cookies_for_url
 from .exceptions.exceptions import TLSClientException
 from .utils.structures import CaseInsensitiveDict
 from .__version__ import __version__
-from .response import build_response
+from .response import Response, build_response
 from .utils.session_utils import random_session_id
 from .utils.identifiers import Client
+from .utils.json_codec import JSONCodec, get_codec
+from .limits import HostLimiter
+from .retry import RetryPolicy
+from .hedging import HedgePolicy
+from .cache import ResponseCache
+from .multipart import MultipartEncoder
+from .utils.body import Base64Body, encode_bytes, encode_stream, is_stream_body
+
+
+# Session attributes that end up in the static part of the request payload, see Session._static_payload_fragment
+STATIC_PAYLOAD_ATTRIBUTES = frozenset({
+    "client_identifier",
+    "ja3_string",
+    "h2_settings",
+    "h2_settings_order",
+    "supported_signature_algorithms",
+    "supported_delegated_credentials_algorithms",
+    "supported_versions",
+    "key_share_curves",
+    "cert_compression_algo",
+    "additional_decode",
+    "pseudo_header_order",
+    "connection_flow",
+    "priority_frames",
+    "header_order",
+    "header_priority",
+    "random_tls_extension_order",
+    "force_http1",
+    "transportOptions",
+    "connectHeaders",
+    "catch_panics",
+    "debug",
+})
+
+
+def _release_abandoned_session(session_id: str, worker_pool: Optional[FFIWorkerPool]) -> None:
+    """Finalizer of Session objects that were never closed, hands the session to the worker pool's reaper thread."""
+    (worker_pool or get_worker_pool()).release_session(session_id)
+
+
+# Response headers that make it necessary to run the cookie jar over a response
+SET_COOKIE_HEADERS = ("set-cookie", "set-cookie2")
+
+REDIRECT_STATUS_CODES = (300, 301, 302, 303, 307, 308)
+
+# Size of the blocks tls-client writes streamed bodies to disk in
+STREAM_BLOCK_SIZE = 64 * 1024
 
 
 class Session:
+    # Serialized static part of the request payload, rebuilt lazily after one of its attributes changed
+    _static_payload: Optional[bytes] = None
+
     def __init__(
             self,
             client: Optional[Client] = None,
@@ -39,7 +100,15 @@ class Session:
             catch_panics: Optional = False,
             debug: Optional = False,
             transportOptions: Optional[dict] = None,
-            connectHeaders: Optional[dict] = None
+            connectHeaders: Optional[dict] = None,
+            worker_pool: Optional[FFIWorkerPool] = None,
+            worker_decode_threshold: Optional[int] = WORKER_DECODE_THRESHOLD,
+            json_codec: Optional[JSONCodec] = None,
+            limiter: Optional[HostLimiter] = None,
+            retry: Optional[RetryPolicy] = None,
+            hedge: Optional[HedgePolicy] = None,
+            cache: Optional[ResponseCache] = None,
+            coalesce: bool = False
     ) -> None:
         self.client_identifier = client.value if client else None
         self._session_id = random_session_id()
@@ -270,9 +339,143 @@ class Session:
         # debugging
         self.debug = debug
 
+        # Thread pool used for calls into the shared library
+        # None uses the process-wide pool, see noble_tls.c.cffi.configure_worker_pool
+        self._worker_pool = worker_pool
+
+        # Responses of at least this many bytes are decoded and parsed on the worker thread, keeping large bodies
+        # from stalling the event loop. 0 always decodes on the worker, None always decodes on the event loop.
+        self.worker_decode_threshold = worker_decode_threshold
+
+        # JSON codec for the payloads exchanged with tls-client
+        # None uses the process-wide codec, see noble_tls.utils.json_codec.set_codec
+        self._json_codec = json_codec
+
+        # Per-host concurrency and rate limits (HostLimiter, or AdaptiveLimiter to tune them automatically),
+        # requests wait for them before they take up a worker thread
+        self.limiter = limiter
+
+        # Retries of failed idempotent requests with backoff, None disables retries
+        self.retry = retry
+
+        # Second attempts for slow idempotent requests, sent on separate Go-side sessions, one per hedge proxy
+        self.hedge = hedge
+        self._hedge_sessions: Dict[Optional[str], Tuple[str, weakref.finalize]] = {}
+
+        # HTTP cache for GET requests, can be shared between sessions
+        self.cache = cache
+
+        # Identical GET / HEAD requests in flight at the same time share one call into tls-client
+        self.coalesce = coalesce
+        self._in_flight_requests: Dict[tuple, asyncio.Future] = {}
+
         # loop
         self.loop = asyncio.get_event_loop()
 
+        # Destroys the Go-side session if this object is garbage collected without being closed
+        self._closed = False
+        self._finalizer = weakref.finalize(self, _release_abandoned_session, self._session_id, worker_pool)
+        self._finalizer.atexit = False
+
+    @property
+    def worker_pool(self) -> FFIWorkerPool:
+        return self._worker_pool or get_worker_pool()
+
+    @worker_pool.setter
+    def worker_pool(self, pool: Optional[FFIWorkerPool]):
+        self._worker_pool = pool
+
+    @property
+    def json_codec(self) -> JSONCodec:
+        return self._json_codec or get_codec()
+
+    @json_codec.setter
+    def json_codec(self, codec: Optional[JSONCodec]):
+        self._json_codec = codec
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def close(self) -> None:
+        """Destroys the Go-side client of this session, releasing its connections and cookie jar.
+        The session can not be used for requests afterwards."""
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer.detach()
+        await self.worker_pool.run(destroy_session_by_id, self._session_id)
+        for session_id, finalizer in self._hedge_sessions.values():
+            if finalizer.detach():
+                await self.worker_pool.run(destroy_session_by_id, session_id)
+
+    def __setattr__(self, name, value):
+        if name in STATIC_PAYLOAD_ATTRIBUTES:
+            self.__dict__["_static_payload"] = None
+        super().__setattr__(name, value)
+
+    def invalidate_payload_template(self) -> None:
+        """Rebuild the static request payload on the next request.
+        Only needed after mutating one of the fingerprint settings in place, e.g. ``session.h2_settings[key] = value``,
+        reassigning an attribute invalidates the template automatically."""
+        self._static_payload = None
+
+    def _static_payload_fragment(self, codec: JSONCodec) -> bytes:
+        """The serialized fields that are identical for every request of this session, without the enclosing braces."""
+        if self._static_payload is None:
+            static_payload = {
+                "forceHttp1": self.force_http1,
+                "withDebug": self.debug,
+                "catchPanics": self.catch_panics,
+                "headerOrder": self.header_order,
+                "additionalDecode": self.additional_decode,
+                "transportOptions": self.transportOptions,
+                "connectHeaders": self.connectHeaders,
+            }
+            if self.client_identifier is None:
+                static_payload["customTlsClient"] = {
+                    "ja3String": self.ja3_string,
+                    "h2Settings": self.h2_settings,
+                    "h2SettingsOrder": self.h2_settings_order,
+                    "pseudoHeaderOrder": self.pseudo_header_order,
+                    "connectionFlow": self.connection_flow,
+                    "priorityFrames": self.priority_frames,
+                    "headerPriority": self.header_priority,
+                    "certCompressionAlgos": [self.cert_compression_algo],
+                    "alpnProtocols": ["h2", "http/1.1"],
+                    "supportedVersions": self.supported_versions,
+                    "supportedSignatureAlgorithms": self.supported_signature_algorithms,
+                    "supportedDelegatedCredentialsAlgorithms": self.supported_delegated_credentials_algorithms,
+                    "keyShareCurves": self.key_share_curves,
+                }
+            else:
+                static_payload["tlsClientIdentifier"] = self.client_identifier
+                static_payload["withRandomTLSExtensionOrder"] = self.random_tls_extension_order
+
+            encoded = codec.dumps(static_payload)
+            self._static_payload = encoded[encoded.index(b"{") + 1:encoded.rindex(b"}")]
+        return self._static_payload
+
+    def _encode_payload(self, request_payload: dict, codec: JSONCodec) -> bytes:
+        """Serializes the per-request fields and splices in the cached static fields.
+        A base64 encoded byte body is spliced in as well, base64 needs no JSON escaping."""
+        request_body = request_payload.get("requestBody")
+        if not isinstance(request_body, (bytes, bytearray)):
+            encoded = codec.dumps(request_payload)
+            return b"".join((encoded[:encoded.rindex(b"}")], b",", self._static_payload_fragment(codec), b"}"))
+
+        encoded = codec.dumps({name: value for name, value in request_payload.items() if name != "requestBody"})
+        return b"".join((
+            encoded[:encoded.rindex(b"}")], b',"requestBody":"', request_body, b'",',
+            self._static_payload_fragment(codec), b"}"
+        ))
+
     @property
     def timeout(self):
         return self.timeout_seconds
@@ -281,31 +484,25 @@ class Session:
     def timeout(self, seconds):
         self.timeout_seconds = seconds
 
-    async def execute_request(
+    def _prepare_request(
             self,
-            method: str,
             url: str,
-            params: Optional[dict] = None,  # Optional[dict[str, str]]
+            params: Optional[dict] = None,
             data: Optional[Union[str, dict]] = None,
-            headers: Optional[dict] = None,  # Optional[dict[str, str]]
-            cookies: Optional[dict] = None,  # Optional[dict[str, str]]
-            json: Optional[dict] = None,  # Optional[dict]
-            allow_redirects: Optional[bool] = True,
-            insecure_skip_verify: Optional[bool] = False,
+            headers: Optional[dict] = None,
+            cookies: Optional[dict] = None,
+            json: Optional[dict] = None,
             timeout_seconds: Optional[int] = None,
             timeout: Optional[int] = None,
-            proxy: Optional[dict] = None,  # Optional[dict[str, str]]
-            is_byte_response: Optional[bool] = False
-    ):
-
+            proxy: Optional[dict] = None
+    ) -> tuple:
+        """Resolves the per-request arguments against the session defaults.
+        :return: Tuple of url, headers, cookie jar, request body, proxy url and timeout."""
         # --- Timeout --------------------------------------------------------------------------------------------------
         # maximum time to wait for a response
         timeout_seconds = timeout or timeout_seconds or self.timeout_seconds
         del timeout  # deleting alias to stop further usage
 
-        # --- History ------------------------------------------------------------------------------------------------------
-        history = []  # Initialize an empty list to store the history of responses
-
         # --- URL ------------------------------------------------------------------------------------------------------
         # Prepare URL - add params to url
         if params is not None:
@@ -316,10 +513,15 @@ class Session:
         # Data has priority. JSON is only used if data is None.
         if data is None and json is not None:
             if type(json) in [dict, list]:
+                # request bodies keep the stdlib formatting so they are sent exactly as requests would send them
                 json = dumps(json)
             request_body = json
             content_type = "application/json"
-        elif data is not None and type(data) not in [str, bytes]:
+        elif isinstance(data, MultipartEncoder):
+            # the boundary differs per body, the header is set on the request below, not on the session
+            request_body = data
+            content_type = None
+        elif data is not None and not is_stream_body(data) and type(data) not in [str, bytes, bytearray, memoryview]:
             request_body = urllib.parse.urlencode(data, doseq=True)
             content_type = "application/x-www-form-urlencoded"
         else:
@@ -345,17 +547,14 @@ class Session:
 
             headers = merged_headers
 
+        if isinstance(request_body, MultipartEncoder):
+            headers = CaseInsensitiveDict(headers)
+            headers["Content-Type"] = request_body.content_type
+
         # --- Cookies --------------------------------------------------------------------------------------------------
         cookies = cookies or {}
         # Merge with session cookies
         cookies = merge_cookies(self.cookies, cookies)
-        # turn cookie jar into dict
-        # in the cookie value the " gets removed, because the fhttp library in golang doesn't accept the character
-        request_cookies = [
-            {'domain': c.domain, 'expires': c.expires, 'name': c.name, 'path': c.path,
-             'value': c.value.replace('"', "")}
-            for c in cookies
-        ]
 
         # --- Proxy ----------------------------------------------------------------------------------------------------
         proxy = proxy or self.proxies
@@ -367,94 +566,537 @@ class Session:
         else:
             proxy = ""
 
+        return url, headers, cookies, request_body, proxy, timeout_seconds
 
+    def _request_payload(
+            self,
+            method: str,
+            url: str,
+            headers: CaseInsensitiveDict,
+            cookies,
+            request_body,
+            proxy: str,
+            timeout_seconds: int,
+            allow_redirects: bool,
+            insecure_skip_verify: bool,
+            is_byte_response: bool
+    ) -> dict:
+        """The per-request fields of the tls-client payload, see _encode_payload for the static ones."""
+        # --- Request --------------------------------------------------------------------------------------------------
+        # turn the cookies that apply to this url into dicts
+        # in the cookie value the " gets removed, because the fhttp library in golang doesn't accept the character
+        request_cookies = [
+            {'domain': c.domain, 'expires': c.expires, 'name': c.name, 'path': c.path,
+             'value': c.value.replace('"', "")}
+            for c in cookies_for_url(cookies, url)
+        ]
+        if isinstance(request_body, (bytes, bytearray, memoryview)):
+            request_body = encode_bytes(request_body)
+        is_byte_request = isinstance(request_body, (bytes, Base64Body))
+        if isinstance(request_body, Base64Body):
+            request_body = request_body.data
+        return {
+            "sessionId": self._session_id,
+            "followRedirects": allow_redirects,
+            "headers": dict(headers),
+            "insecureSkipVerify": insecure_skip_verify,
+            "isByteRequest": is_byte_request,
+            "isByteResponse": is_byte_response,
+            "proxyUrl": proxy,
+            "requestUrl": url,
+            "requestMethod": method,
+            # byte bodies stay base64 encoded bytes, _encode_payload splices them in without another copy to str
+            "requestBody": request_body,
+            "requestCookies": request_cookies,
+            "timeoutSeconds": timeout_seconds,
+        }
 
-        while True:
-            # --- Request --------------------------------------------------------------------------------------------------
-            is_byte_request = isinstance(request_body, (bytes, bytearray))
-            request_payload = {
-                "sessionId": self._session_id,
-                "followRedirects": allow_redirects,
-                "forceHttp1": self.force_http1,
-                "withDebug": self.debug,
-                "catchPanics": self.catch_panics,
-                "headers": dict(headers),
-                "headerOrder": self.header_order,
-                "insecureSkipVerify": insecure_skip_verify,
-                "isByteRequest": is_byte_request,
-                "isByteResponse": is_byte_response,
-                "additionalDecode": self.additional_decode,
-                "proxyUrl": proxy,
-                "requestUrl": url,
-                "requestMethod": method,
-                "requestBody": base64.b64encode(request_body).decode() if is_byte_request else request_body,
-                "requestCookies": request_cookies,
-                "timeoutSeconds": timeout_seconds,
-                "transportOptions": self.transportOptions,
-                "connectHeaders": self.connectHeaders
-            }
-            if self.client_identifier is None:
-                request_payload["customTlsClient"] = {
-                    "ja3String": self.ja3_string,
-                    "h2Settings": self.h2_settings,
-                    "h2SettingsOrder": self.h2_settings_order,
-                    "pseudoHeaderOrder": self.pseudo_header_order,
-                    "connectionFlow": self.connection_flow,
-                    "priorityFrames": self.priority_frames,
-                    "headerPriority": self.header_priority,
-                    "certCompressionAlgos": [self.cert_compression_algo],
-                    "alpnProtocols": ["h2", "http/1.1"],
-                    "supportedVersions": self.supported_versions,
-                    "supportedSignatureAlgorithms": self.supported_signature_algorithms,
-                    "supportedDelegatedCredentialsAlgorithms": self.supported_delegated_credentials_algorithms,
-                    "keyShareCurves": self.key_share_curves,
-                }
-            else:
-                request_payload["tlsClientIdentifier"] = self.client_identifier
-                request_payload["withRandomTLSExtensionOrder"] = self.random_tls_extension_order
-
-            loop = asyncio.get_event_loop()
-            # this is a pointer to the response
-            response = await loop.run_in_executor(None, request, dumps(request_payload).encode('utf-8'))
-
-            # dereference the pointer to a byte array
-            response_bytes = ctypes.string_at(response)
-            # convert our byte array to a string (tls client returns json)
-            response_string = response_bytes.decode('utf-8')
-            # convert response string to json
-            response_object = loads(response_string)
-            # free the memory
-            await loop.run_in_executor(None, free_memory, response_object['id'].encode('utf-8'))
-
-            # --- Response -------------------------------------------------------------------------------------------------
-            # Error handling
-            if response_object["status"] == 0:
-                raise TLSClientException(response_object["body"])
-            # Set response cookies
+    def _process_response(
+            self,
+            response_object: dict,
+            url: str,
+            headers: CaseInsensitiveDict,
+            cookies,
+            is_byte_response: bool
+    ) -> Response:
+        """Turns a tls-client response object into a Response, updating the session cookies."""
+        # --- Response -------------------------------------------------------------------------------------------------
+        # Error handling
+        if response_object["status"] == 0:
+            raise TLSClientException(response_object["body"])
+        # Set response cookies, the cookie jar machinery only runs if the server actually sent cookies
+        response_headers = response_object["headers"] or {}
+        if any(name.lower() in SET_COOKIE_HEADERS for name in response_headers):
             response_cookie_jar = extract_cookies_to_jar(
                 request_url=url,
                 request_headers=headers,
                 cookie_jar=cookies,
-                response_headers=response_object["headers"]
+                response_headers=response_headers
+            )
+        else:
+            response_cookie_jar = None
+        # build response class
+        return build_response(response_object, response_cookie_jar, is_byte_response)
+
+    async def _send(self, request_payload: dict) -> dict:
+        """Sends the payload through the worker pool, after waiting for the limiter if there is one.
+        :return: The parsed tls-client response object, its memory is already freed or scheduled to be."""
+        limiter = self.limiter
+        if limiter is None:
+            return await self._send_unlimited(request_payload)
+
+        host = urllib.parse.urlsplit(request_payload["requestUrl"]).hostname or ""
+        async with limiter.slot(host):
+            started = time.perf_counter()
+            try:
+                response_object = await self._send_unlimited(request_payload)
+            except Exception as e:
+                limiter.observe(host, time.perf_counter() - started, error=e)
+                raise
+            limiter.observe(host, time.perf_counter() - started, status=response_object.get("status"))
+        return response_object
+
+    async def _send_unlimited(self, request_payload: dict) -> dict:
+        codec = self.json_codec
+        handoff = ResponseHandoff(codec.loads)
+        try:
+            response = await self.worker_pool.run(
+                request_response, self._encode_payload(request_payload, codec), self.worker_decode_threshold,
+                codec.loads, handoff, request_payload["isByteResponse"]
             )
-            # build response class
-            current_response = build_response(response_object, response_cookie_jar)
-            # check for redirect
-            if allow_redirects:
-                if 'Location' in (headers := current_response.headers) and current_response.status_code in (
-                    300, 301, 302, 303, 307, 308
+        except asyncio.CancelledError:
+            # nobody is going to read the response, make sure it still gets freed
+            handoff.abandon()
+            raise
+
+        if isinstance(response, bytes):
+            # small response, parse it here (tls client returns json)
+            response_object = codec.loads(response)
+            # free the memory in the background, nothing is left to await
+            self.worker_pool.release(response_object['id'])
+            return response_object
+        # already decoded and freed on the worker thread
+        return response
+
+    def _hedge_session_id(self, proxy: Optional[str]) -> str:
+        """The Go-side session hedges through ``proxy`` are sent on, tls-client rebuilds a session's transport when its
+        proxy changes, so every hedge proxy gets its own session to keep its connections warm."""
+        hedge_session = self._hedge_sessions.get(proxy)
+        if hedge_session is None:
+            session_id = f"{self._session_id}-hedge-{len(self._hedge_sessions)}"
+            # the hedge session lives in Go until this session is closed or garbage collected
+            finalizer = weakref.finalize(self, _release_abandoned_session, session_id, self._worker_pool)
+            finalizer.atexit = False
+            hedge_session = self._hedge_sessions[proxy] = (session_id, finalizer)
+        return hedge_session[0]
+
+    def _hedge_payload(self, request_payload: dict) -> dict:
+        """A copy of the payload for a hedge, sent on a hedge session and through the next hedge proxy if any."""
+        hedge_payload = dict(request_payload)
+        proxy = self.hedge.next_proxy()
+        if proxy is not None:
+            hedge_payload["proxyUrl"] = proxy
+        hedge_payload["sessionId"] = self._hedge_session_id(hedge_payload.get("proxyUrl"))
+        return hedge_payload
+
+    async def _send_hedged(self, method: str, request_payload: dict) -> dict:
+        """Sends the payload, racing a hedge against it if the session's hedge policy applies."""
+        hedge = self.hedge
+        if hedge is None or method.upper() not in hedge.methods or "streamOutputPath" in request_payload:
+            # two copies of a streamed request would write to the same file
+            return await self._send(request_payload)
+
+        started = time.perf_counter()
+        delay = hedge.delay()
+        primary = asyncio.ensure_future(self._send(request_payload))
+        secondary = None
+        pending = {primary}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=delay if secondary is None else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    # tls-client reports connection errors as status 0, keep waiting on the other attempt for those
+                    if task.exception() is None and task.result()["status"] != 0:
+                        hedge.record(time.perf_counter() - started)
+                        if secondary is not None:
+                            hedge.record_hedge(won=task is secondary)
+                        return task.result()
+                if not done and secondary is None:
+                    # the first attempt is slower than usual, race a copy against it
+                    secondary = asyncio.ensure_future(self._send(self._hedge_payload(request_payload)))
+                    pending.add(secondary)
+            # every attempt failed, report the error of the first one
+            if secondary is not None:
+                hedge.record_hedge(won=False)
+            return primary.result()
+        finally:
+            # a losing attempt's response is freed by its handoff once tls-client returns it
+            for task in pending:
+                task.cancel()
+
+    async def _send_cached(self, method: str, request_payload: dict) -> dict:
+        """Answers the request from the session's cache if possible, revalidating stale responses, and stores the
+        response otherwise."""
+        cache = self.cache
+        key = cache.key(request_payload) if cache is not None else None
+        if key is None:
+            return await self._send_hedged(method, request_payload)
+
+        entry = await cache.lookup(key, request_payload)
+        if entry is not None:
+            response_object = cache.hit(entry, request_payload)
+            if response_object is not None:
+                return response_object
+            validators = cache.conditional_headers(entry)
+            if validators:
+                request_payload = dict(request_payload, headers={**request_payload["headers"], **validators})
+
+        response_object = await self._send_hedged(method, request_payload)
+        if entry is not None and response_object["status"] == 304:
+            # not modified, the stored response becomes the answer
+            return await cache.revalidated(key, entry, response_object)
+        await cache.store(key, response_object, request_payload)
+        return response_object
+
+    async def _send_coalesced(self, method: str, request_payload: dict) -> dict:
+        """Sends the payload, or joins an identical GET / HEAD request that is already in flight if coalescing is on.
+        Every caller gets its own copy of the response object and builds its own Response from it."""
+        if not self.coalesce or method.upper() not in ("GET", "HEAD") or "streamOutputPath" in request_payload:
+            return await self._send_cached(method, request_payload)
+
+        key = (
+            method.upper(),
+            request_payload["requestUrl"],
+            tuple(sorted((name.lower(), value) for name, value in request_payload["headers"].items())),
+            tuple((cookie["name"], cookie["value"]) for cookie in request_payload["requestCookies"]),
+            request_payload["proxyUrl"],
+            request_payload["followRedirects"],
+            request_payload["insecureSkipVerify"],
+            request_payload["isByteResponse"],
+        )
+        task = self._in_flight_requests.get(key)
+        if task is None:
+            # the request runs as a task of its own, so one caller giving up does not cancel it for the others
+            task = asyncio.ensure_future(self._send_cached(method, request_payload))
+            self._in_flight_requests[key] = task
+            task.add_done_callback(lambda done: self._request_landed(key, done))
+        return dict(await asyncio.shield(task))
+
+    def _request_landed(self, key: tuple, task: asyncio.Future) -> None:
+        if self._in_flight_requests.get(key) is task:
+            del self._in_flight_requests[key]
+        if not task.cancelled():
+            # mark the error as retrieved in case every caller was cancelled
+            task.exception()
+
+    async def _send_with_retry(
+            self,
+            method: str,
+            request_payload: dict,
+            url: str,
+            headers: CaseInsensitiveDict,
+            cookies,
+            is_byte_response: bool
+    ) -> Response:
+        """Sends the payload and builds the response, retrying as the session's retry policy allows."""
+        retry = self.retry
+        if retry is None:
+            response_object = await self._send_coalesced(method, request_payload)
+            return self._process_response(response_object, url, headers, cookies, is_byte_response)
+
+        retry.budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                response_object = await self._send_coalesced(method, request_payload)
+                response = self._process_response(response_object, url, headers, cookies, is_byte_response)
+            except Exception as e:
+                delay = retry.next_delay(method, attempt, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = retry.next_delay(method, attempt, response=response)
+                if delay is None:
+                    return response
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def execute_request(
+            self,
+            method: str,
+            url: str,
+            params: Optional[dict] = None,  # Optional[dict[str, str]]
+            data: Optional[Union[str, dict]] = None,
+            headers: Optional[dict] = None,  # Optional[dict[str, str]]
+            cookies: Optional[dict] = None,  # Optional[dict[str, str]]
+            json: Optional[dict] = None,  # Optional[dict]
+            allow_redirects: Optional[bool] = True,
+            insecure_skip_verify: Optional[bool] = False,
+            timeout_seconds: Optional[int] = None,
+            timeout: Optional[int] = None,
+            proxy: Optional[dict] = None,  # Optional[dict[str, str]]
+            is_byte_response: Optional[bool] = False,
+            stream: Optional[bool] = False,
+            stream_to: Optional[str] = None,
+            stream_block_size: int = STREAM_BLOCK_SIZE
+    ):
+        """Sends a request.
+        With ``stream`` tls-client writes the body to a temporary file instead of handing it back through memory;
+        read it with ``Response.iter_content`` / ``aiter_bytes`` and ``close`` the response to delete the file.
+        ``stream_to`` writes the body to the given path instead, see ``download_to``."""
+
+        if self._closed:
+            raise TLSClientException("Session is closed.")
+
+        # --- Streaming ----------------------------------------------------------------------------------------------------
+        stream_path = stream_to
+        if stream and stream_path is None:
+            descriptor, stream_path = tempfile.mkstemp(prefix="noble-tls-", suffix=".body")
+            os.close(descriptor)
+
+        # --- History ------------------------------------------------------------------------------------------------------
+        history = []  # Initialize an empty list to store the history of responses
+
+        try:
+            url, headers, cookies, request_body, proxy, timeout_seconds = self._prepare_request(
+                url, params, data, headers, cookies, json, timeout_seconds, timeout, proxy
+            )
+            if is_stream_body(request_body):
+                # read once, the encoded body is reused for redirects and retries
+                request_body = await encode_stream(request_body)
+
+            while True:
+                request_payload = self._request_payload(
+                    method, url, headers, cookies, request_body, proxy, timeout_seconds, allow_redirects,
+                    insecure_skip_verify, is_byte_response
+                )
+                if stream_path is not None:
+                    # the body goes straight from Go into the file, the response only carries status and headers
+                    request_payload["streamOutputPath"] = stream_path
+                    request_payload["streamOutputBlockSize"] = stream_block_size
+
+                current_response = await self._send_with_retry(
+                    method, request_payload, url, headers, cookies, is_byte_response
+                )
+                # check for redirect
+                if (
+                    allow_redirects
+                    and current_response.status_code in REDIRECT_STATUS_CODES
+                    and 'Location' in current_response.headers
                 ):
                     history.append(current_response)
-                    url = headers['Location']
+                    url = current_response.headers['Location']
                 else:
                     break
-            else:
-                break
+        except BaseException:
+            if stream_path is not None and stream_to is None:
+                os.remove(stream_path)
+            raise
+
+        if stream_path is not None:
+            current_response.attach_stream(stream_path, temporary=stream_to is None)
 
         # Assign the history to the final response
         current_response.history = history
         return current_response
 
+    async def download_to(
+            self,
+            url: str,
+            path: str,
+            method: str = "GET",
+            **kwargs: Any
+    ) -> Response:
+        """Downloads ``url`` to ``path`` without holding the body in memory, tls-client writes it to the file
+        in blocks of ``stream_block_size`` bytes as it arrives.
+
+        Example:
+            response = await session.download_to("https://www.example.com/artifact.tar.gz", "/tmp/artifact.tar.gz")
+            response.raise_for_status()
+
+        :param url: URL to download.
+        :param path: File the body is written to, it is replaced if it exists and kept when the response is closed.
+        :param method: Request method.
+        :param kwargs: Further arguments for execute_request, e.g. headers or stream_block_size.
+        :return: The response, its body is read from ``path``.
+        """
+        return await self.execute_request(method=method, url=url, stream_to=path, **kwargs)
+
+    async def preconnect(
+            self,
+            urls: Iterable[str],
+            concurrency: int = 8,
+            method: str = "HEAD",
+            **kwargs: Any
+    ) -> Dict[str, Union[float, Exception]]:
+        """Establishes the TLS / HTTP2 connections to the origins of ``urls`` ahead of time.
+        A lightweight request (HEAD by default, redirects are not followed) is sent to each distinct origin so
+        the Go-side transport of this session holds a warm connection once real traffic arrives.
+
+        :param urls: URLs whose origins should be warmed up, paths are ignored.
+        :param concurrency: Maximum number of origins warmed up at once.
+        :param method: Request method used for warming up, e.g. "HEAD" or "OPTIONS".
+        :param kwargs: Further arguments for execute_request, e.g. proxy or headers.
+        :return: Seconds each origin took to answer (connection setup included), or the exception it failed with.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        origins = {}
+        for url in urls:
+            parsed = urllib.parse.urlsplit(url)
+            origins.setdefault(f"{parsed.scheme}://{parsed.netloc}", None)
+
+        kwargs.setdefault("allow_redirects", False)
+        semaphore = asyncio.Semaphore(concurrency)
+        results = {}
+
+        async def warm(origin: str):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    await self.execute_request(method=method, url=f"{origin}/", **kwargs)
+                except Exception as e:
+                    results[origin] = e
+                else:
+                    results[origin] = time.perf_counter() - started
+
+        await asyncio.gather(*(warm(origin) for origin in origins))
+        return results
+
+    async def fetch_many(
+            self,
+            requests: Iterable[Union[str, Mapping[str, Any]]],
+            concurrency: int = 16,
+            return_exceptions: bool = False
+    ) -> AsyncIterator[Tuple[Union[str, Mapping[str, Any]], Union[Any, Exception]]]:
+        """Sends many requests with at most ``concurrency`` in flight, yielding responses as they complete.
+        ``requests`` is consumed lazily, only as many items are taken as there are free slots, so it can be a
+        generator over millions of URLs while memory stays flat.
+
+        Example:
+            async for request, response in session.fetch_many(urls, concurrency=32):
+                print(request, response.status_code)
+
+        :param requests: URLs (sent as GET) or dicts of execute_request arguments, e.g. {"method": "POST", "url": url,
+            "json": {...}}. The method defaults to GET.
+        :param concurrency: Maximum number of requests in flight.
+        :param return_exceptions: Yield failed requests with their exception instead of raising it.
+        :return: Async iterator of (request, response) tuples in completion order. Requests still in flight when
+            the iteration is stopped early are cancelled.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        requests = iter(requests)
+        pending = {}
+
+        def fill():
+            while len(pending) < concurrency:
+                try:
+                    item = next(requests)
+                except StopIteration:
+                    return
+                kwargs = {"method": "GET", "url": item} if isinstance(item, str) else {"method": "GET", **item}
+                pending[asyncio.ensure_future(self.execute_request(**kwargs))] = item
+
+        try:
+            fill()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                completed = [(pending.pop(task), task) for task in done]
+                # keep the pipeline full while the caller handles the completed responses
+                fill()
+                for item, task in completed:
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        if not return_exceptions:
+                            raise
+                        result = e
+                    yield item, result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def execute_batch(
+            self,
+            requests: Iterable[Union[str, Mapping[str, Any]]],
+            workers: Optional[int] = None,
+            return_exceptions: bool = False
+    ) -> List[Union[Response, Exception]]:
+        """Sends many small requests with as few round trips between the event loop and the worker pool as possible.
+        The payloads go into a shared queue that ``workers`` worker calls drain, each sending the next queued request
+        as soon as its previous one returned and decoding and freeing the responses on its thread. The event loop
+        awaits one future per worker call instead of one per request, and a slow request only holds up its own worker.
+
+        This saves the per-request executor hop and event loop wakeup, which only pays off for large numbers of small,
+        fast requests. The worker calls occupy their threads until the queue is empty, so other requests on the same
+        worker pool wait behind the batch.
+
+        Redirects are followed by tls-client as usual. The cookies set by one request only reach requests of later
+        calls, not the other requests of the same batch. Batches bypass the session's cache, hedging and coalescing;
+        sessions with a limiter or retry policy can not send batches, as neither could be enforced per request.
+
+        :param requests: URLs (sent as GET) or dicts of execute_request arguments. The method defaults to GET.
+        :param workers: Number of worker calls draining the queue, defaults to the worker pool's size.
+        :param return_exceptions: Return failed requests as their exception instead of raising it.
+        :return: The responses, in the order of ``requests``.
+        """
+        if self._closed:
+            raise TLSClientException("Session is closed.")
+        if self.limiter is not None or self.retry is not None:
+            raise TLSClientException("execute_batch can not be used on sessions with a limiter or retry policy.")
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        codec = self.json_codec
+        prepared = []
+        jobs = queue.SimpleQueue()
+        for item in requests:
+            kwargs = {"method": "GET", "url": item} if isinstance(item, str) else {"method": "GET", **item}
+            method = kwargs.pop("method")
+            allow_redirects = kwargs.pop("allow_redirects", True)
+            insecure_skip_verify = kwargs.pop("insecure_skip_verify", False)
+            is_byte_response = kwargs.pop("is_byte_response", False)
+            url, headers, cookies, request_body, proxy, timeout_seconds = self._prepare_request(**kwargs)
+            if is_stream_body(request_body):
+                request_body = await encode_stream(request_body)
+            request_payload = self._request_payload(
+                method, url, headers, cookies, request_body, proxy, timeout_seconds, allow_redirects,
+                insecure_skip_verify, is_byte_response
+            )
+            jobs.put((len(prepared), self._encode_payload(request_payload, codec)))
+            prepared.append((url, headers, cookies, is_byte_response))
+
+        results = [None] * len(prepared)
+        workers = min(workers or self.worker_pool.max_workers, len(prepared))
+        try:
+            await asyncio.gather(*(
+                self.worker_pool.run(request_batch, jobs, results, codec.loads) for _ in range(workers)
+            ))
+        finally:
+            # on cancellation, the worker calls stop after the request they are sending
+            while not jobs.empty():
+                try:
+                    jobs.get_nowait()
+                except queue.Empty:
+                    break
+
+        responses = []
+        for (url, headers, cookies, is_byte_response), response_object in zip(prepared, results):
+            try:
+                if isinstance(response_object, Exception):
+                    raise response_object
+                responses.append(self._process_response(response_object, url, headers, cookies, is_byte_response))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                responses.append(e)
+        return responses
+
     async def get(
             self,
             url: str,
@@ -0,0 +1,97 @@
+import pytest
+from ..cache import ResponseCache, parse_cache_control
+from ..sessions import Session
+
+
+def make_payload(url="https://example.com/config", headers=None, method="GET"):
+    return {"requestMethod": method, "requestUrl": url, "headers": headers or {}, "requestCookies": []}
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('max-age=60, no-cache, private="set-cookie"') == {
+        "max-age": "60", "no-cache": None, "private": "set-cookie"
+    }
+
+
+@pytest.mark.asyncio
+async def test_cache_freshness_and_vary():
+    cache = ResponseCache()
+    payload = make_payload(headers={"Accept-Language": "en"})
+    key = cache.key(payload)
+    response_object = {
+        "id": "1", "status": 200, "body": "cached", "target": payload["requestUrl"],
+        "headers": {"Cache-Control": ["max-age=60"], "Vary": ["Accept-Language"], "Set-Cookie": ["sid=1"]},
+    }
+
+    assert await cache.store(key, response_object, payload, now=1000.0)
+    entry = await cache.lookup(key, payload)
+    hit = cache.hit(entry, payload, now=1030.0)
+    assert hit["body"] == "cached"
+    assert "Set-Cookie" not in hit["headers"], "Cookies must not be replayed from the cache"
+    assert cache.hit(entry, payload, now=1061.0) is None, "Stale responses need revalidation"
+
+    assert await cache.lookup(key, make_payload(headers={"Accept-Language": "de"})) is None
+    assert cache.key(make_payload(method="POST")) is None
+    assert not await cache.store(key, dict(response_object, headers={"Cache-Control": ["no-store"]}), payload)
+
+
+def test_cache_key_includes_transport_settings():
+    payload = dict(make_payload(), followRedirects=True, proxyUrl="", insecureSkipVerify=False)
+    assert ResponseCache.key(payload) != ResponseCache.key(dict(payload, followRedirects=False))
+    assert ResponseCache.key(payload) != ResponseCache.key(dict(payload, proxyUrl="http://proxy:8080"))
+    assert ResponseCache.key(payload) != ResponseCache.key(dict(payload, insecureSkipVerify=True))
+
+
+@pytest.mark.asyncio
+async def test_cache_skips_credentialed_requests_unless_varied():
+    cache = ResponseCache()
+    response_object = {"status": 200, "body": "private", "headers": {"Cache-Control": ["max-age=60"]}}
+
+    authorized = make_payload(headers={"Authorization": "Bearer token"})
+    assert not await cache.store(cache.key(authorized), response_object, authorized)
+    with_cookies = dict(make_payload(), requestCookies=[{"name": "sid", "value": "1"}])
+    assert not await cache.store(cache.key(with_cookies), response_object, with_cookies)
+
+    varied = dict(response_object, headers={"Cache-Control": ["max-age=60"], "Vary": ["Authorization"]})
+    assert await cache.store(cache.key(authorized), varied, authorized)
+    assert await cache.lookup(cache.key(authorized), make_payload()) is None, "Other credentials must miss"
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used_to_disk(tmp_path):
+    cache = ResponseCache(max_size=150, directory=str(tmp_path))
+    for index in range(3):
+        payload = make_payload(url=f"https://example.com/{index}")
+        response_object = {"status": 200, "body": str(index) * 50, "headers": {"Cache-Control": ["max-age=60"]}}
+        await cache.store(cache.key(payload), response_object, payload)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["disk_entries"] == 1
+
+    payload = make_payload(url="https://example.com/0")
+    entry = await cache.lookup(cache.key(payload), payload)
+    assert entry.response_object["body"] == "0" * 50, "Entries evicted from memory should be found on disk"
+    assert cache.stats()["disk_entries"] == 1, "Loading an entry from disk spills another one"
+
+
+@pytest.mark.asyncio
+async def test_session_revalidates_with_etag(mocker):
+    session = Session(cache=ResponseCache())
+    send = mocker.patch.object(session, "_send_hedged", side_effect=[
+        {"id": "1", "status": 200, "body": "v1", "headers": {"Etag": ['"abc"'], "Cache-Control": ["no-cache"]}},
+        {"id": "2", "status": 304, "body": "", "headers": {
+            "Etag": ['"abc"'], "Cache-Control": ["max-age=60"], "Set-Cookie": ["sid=2; Path=/"]
+        }},
+    ])
+
+    first = await session.get("https://example.com/config")
+    second = await session.get("https://example.com/config")
+    third = await session.get("https://example.com/config")
+
+    assert [first.text, second.text, third.text] == ["v1", "v1", "v1"]
+    assert second.status_code == 200, "A 304 should be turned back into the stored response"
+    assert send.call_args_list[1].args[1]["headers"]["If-None-Match"] == '"abc"'
+    assert send.call_count == 2, "The revalidated response is fresh for 60 seconds"
+    assert session.cache.stats()["hits"] == 1
+    assert session.cookies.get("sid") == "2", "Cookies set on a 304 should reach the cookie jar"
+    assert "Set-Cookie" not in third.headers, "Cookies of a 304 must not be stored with the entry"
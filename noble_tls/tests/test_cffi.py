@@ -1,6 +1,12 @@
+import asyncio
+import base64
+import queue
+
 import pytest
 from unittest.mock import MagicMock, patch
-from ..c.cffi import check_and_download_dependencies, run_async_task, load_asset, initialize_library
+from ..c.cffi import check_and_download_dependencies, run_async_task, load_asset, initialize_library, FFIWorkerPool, \
+    request_response, request_batch, ResponseHandoff
+from ..response import build_response
 
 
 @pytest.mark.asyncio
@@ -50,4 +56,104 @@ def test_initialize_library(mocker):
     mocker.patch('ctypes.cdll.LoadLibrary',
                  return_value=MagicMock())  # Mocking LoadLibrary to return a MagicMock object
     library = initialize_library()
-    assert library is not None, "Library should be initialized successfully"
\ No newline at end of file
+    assert library is not None, "Library should be initialized successfully"
+
+@pytest.mark.asyncio
+async def test_worker_pool_runs_calls_on_dedicated_threads():
+    pool = FFIWorkerPool(max_workers=2, max_pending=2)
+    try:
+        import threading
+        names = await asyncio.gather(*[pool.run(lambda: threading.current_thread().name) for _ in range(5)])
+        assert all(name.startswith("noble-tls-ffi") for name in names), "Calls should run on the pool's own threads"
+
+        stats = pool.stats()
+        assert stats["submitted"] == 5
+        assert stats["completed"] == 5
+        assert stats["pending"] == 0
+        assert stats["peak_pending"] <= 2, "max_pending should bound calls handed to the pool"
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_counts_failures():
+    pool = FFIWorkerPool(max_workers=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    try:
+        with pytest.raises(ValueError):
+            await pool.run(fail)
+        assert pool.stats()["failed"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_worker_pool_release_frees_in_background(mocker):
+    free_memory = mocker.patch('noble_tls.c.cffi.free_memory')
+    pool = FFIWorkerPool(max_workers=1)
+
+    pool.release("response-1")
+    pool.release("response-2")
+    pool.shutdown(wait=True)
+
+    free_memory.assert_any_call(b"response-1")
+    free_memory.assert_any_call(b"response-2")
+    assert pool.stats()["freed"] == 2
+
+
+def test_request_response_decodes_large_responses_on_worker(mocker):
+    raw = b'{"id": "large", "status": 200, "body": "' + b'x' * 64 + b'", "headers": {}}'
+    mocker.patch('noble_tls.c.cffi.request', return_value=raw)
+    free_memory = mocker.patch('noble_tls.c.cffi.free_memory')
+
+    assert request_response(b'{}', decode_threshold=None) == raw, "Below threshold the raw bytes are returned"
+    free_memory.assert_not_called()
+
+    response_object = request_response(b'{}', decode_threshold=16)
+    assert response_object["id"] == "large"
+    free_memory.assert_called_once_with(b"large")
+
+
+def test_request_response_decodes_large_byte_bodies_on_worker(mocker):
+    body = base64.b64encode(b"\x00\x01" * 64).decode()
+    raw = b'{"id": "bytes", "status": 200, "body": "data:application/octet-stream;base64,' + body.encode() + b'"}'
+    mocker.patch('noble_tls.c.cffi.request', return_value=raw)
+    mocker.patch('noble_tls.c.cffi.free_memory')
+
+    response_object = request_response(b'{}', decode_threshold=16, is_byte_response=True)
+    assert response_object["body"] == b"\x00\x01" * 64
+    assert build_response(response_object, None, is_byte_response=True).content == b"\x00\x01" * 64
+
+
+def test_response_handoff_frees_abandoned_responses(mocker):
+    free_memory = mocker.patch('noble_tls.c.cffi.free_memory')
+    raw = b'{"id": "abandoned", "status": 200, "body": "", "headers": {}}'
+
+    handoff = ResponseHandoff()
+    handoff.abandon()
+    assert handoff.deliver(raw) is False, "A response delivered after cancellation should be freed"
+    free_memory.assert_called_once_with(b"abandoned")
+
+    handoff = ResponseHandoff()
+    assert handoff.deliver(raw) is True
+    handoff.abandon()
+    assert free_memory.call_count == 2, "A delivered but unclaimed response should be freed on cancellation"
+
+
+def test_request_batch_parses_and_frees_every_response(mocker):
+    responses = [b'{"id": "first", "status": 200}', b'not json']
+    mocker.patch('noble_tls.c.cffi.request', side_effect=responses)
+    free_memory = mocker.patch('noble_tls.c.cffi.free_memory')
+
+    jobs = queue.SimpleQueue()
+    jobs.put((1, b'{}'))
+    jobs.put((0, b'{}'))
+    response_objects = [None, None]
+
+    assert request_batch(jobs, response_objects) == 2
+    assert jobs.empty()
+    assert response_objects[1] == {"id": "first", "status": 200}, "Responses should land at their payload's index"
+    assert isinstance(response_objects[0], ValueError), "A failing payload should not fail the whole batch"
+    free_memory.assert_called_once_with(b"first")
@@ -0,0 +1,65 @@
+import pickle
+
+import pytest
+from ..cookies import RequestsCookieJar, CookieConflictError, create_cookie, remove_cookie_by_name, cookies_for_url, \
+    extract_cookies_to_jar
+from ..utils.structures import CaseInsensitiveDict
+
+
+def make_jar():
+    jar = RequestsCookieJar()
+    jar.set_cookie(create_cookie("session", "a", domain="example.com"))
+    jar.set_cookie(create_cookie("session", "b", domain="example.org"))
+    jar.set_cookie(create_cookie("theme", "dark", domain="example.com", path="/app"))
+    return jar
+
+
+def test_cookie_jar_lookup_by_name_domain_and_path():
+    jar = make_jar()
+
+    assert jar.get("session", domain="example.org") == "b"
+    assert jar.get("theme") == "dark"
+    assert jar.get("theme", path="/") is None
+    assert jar.get("missing", default="x") == "x"
+    with pytest.raises(CookieConflictError):
+        _ = jar["session"]
+
+
+def test_cookie_jar_index_follows_removals():
+    jar = make_jar()
+
+    remove_cookie_by_name(jar, "session", domain="example.com")
+    assert jar["session"] == "b", "Only the example.org cookie should be left"
+
+    jar.clear("example.com")
+    assert "theme" not in jar
+    assert jar._name_index == {"session": {("example.org", "/"): None}}
+
+    restored = pickle.loads(pickle.dumps(jar))
+    assert restored["session"] == "b"
+
+
+def test_cookies_for_url_filters_by_domain_path_secure_and_expiry():
+    jar = RequestsCookieJar()
+    jar.set_cookie(create_cookie("plain", "1"))
+    jar.set_cookie(create_cookie("host", "2", domain="www.example.com"))
+    jar.set_cookie(create_cookie("parent", "3", domain=".example.com"))
+    jar.set_cookie(create_cookie("other", "4", domain="example.org"))
+    jar.set_cookie(create_cookie("app", "5", domain="www.example.com", path="/app"))
+    jar.set_cookie(create_cookie("secure", "6", domain="www.example.com", secure=True))
+    jar.set_cookie(create_cookie("expired", "7", domain="www.example.com", expires=1))
+
+    names = {cookie.name for cookie in cookies_for_url(jar, "http://www.example.com/application")}
+    assert names == {"plain", "host", "parent"}
+
+    names = {cookie.name for cookie in cookies_for_url(jar, "https://www.example.com/app/page")}
+    assert names == {"plain", "host", "parent", "app", "secure"}
+
+    assert "expired" not in jar.keys(), "Expired cookies should be removed from the jar"
+
+
+@pytest.mark.parametrize("url", ["http://[::1]:8080/", "http://127.0.0.1:8080/", "http://localhost:8080/"])
+def test_cookies_for_url_finds_cookies_of_ip_and_dotless_hosts(url):
+    jar = RequestsCookieJar()
+    extract_cookies_to_jar(url, CaseInsensitiveDict(), jar, {"Set-Cookie": ["sid=1; Path=/"]})
+    assert [cookie.name for cookie in cookies_for_url(jar, url + "page")] == ["sid"]
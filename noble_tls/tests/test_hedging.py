@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from ..hedging import HedgePolicy
+from ..sessions import Session
+
+
+def test_hedge_policy_delay_follows_percentile():
+    policy = HedgePolicy(percentile=0.9, min_samples=10, initial_delay=None)
+    assert policy.delay() is None, "No hedging before enough samples were seen"
+
+    for latency in range(1, 11):
+        policy.record(latency / 10)
+    assert policy.delay() == 0.9
+
+
+@pytest.mark.asyncio
+async def test_session_hedge_wins_over_slow_request(mocker):
+    hedge = HedgePolicy(min_samples=1, initial_delay=0.01, proxies=["http://hedge-proxy:8080"])
+    session = Session(hedge=hedge)
+    cancelled = []
+    sent = []
+
+    async def fake_send(request_payload):
+        sent.append(request_payload)
+        if request_payload["sessionId"] == session._session_id:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(request_payload)
+                raise
+        return {"status": 200, "body": "hedge", "headers": {}, "id": "2"}
+
+    mocker.patch.object(session, "_send", side_effect=fake_send)
+    response = await session.get("https://example.com/")
+    await asyncio.sleep(0)
+
+    assert response.text == "hedge"
+    assert sent[1]["sessionId"] == f"{session._session_id}-hedge-0"
+    assert sent[1]["proxyUrl"] == "http://hedge-proxy:8080"
+    assert cancelled == [sent[0]], "The losing request should be cancelled"
+    assert hedge.stats()["hedge_wins"] == 1
+
+    # POST is not idempotent and never hedged
+    sent.clear()
+    session._send.side_effect = None
+    session._send.return_value = {"status": 200, "body": "", "headers": {}, "id": "3"}
+    await session.post("https://example.com/")
+    assert hedge.stats()["hedged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_session_hedge_wins_over_failed_request(mocker):
+    hedge = HedgePolicy(min_samples=1, initial_delay=0.01)
+    session = Session(hedge=hedge)
+
+    async def fake_send(request_payload):
+        if request_payload["sessionId"] == session._session_id:
+            await asyncio.sleep(0.05)
+            return {"status": 0, "body": "connection reset", "headers": {}, "id": "1"}
+        await asyncio.sleep(0.1)
+        return {"status": 200, "body": "hedge", "headers": {}, "id": "2"}
+
+    mocker.patch.object(session, "_send", side_effect=fake_send)
+    response = await session.get("https://example.com/")
+
+    assert response.status_code == 200
+    assert response.text == "hedge"
+    assert hedge.stats()["hedge_wins"] == 1
+    assert hedge.stats()["requests"] == 1, "Only the successful attempt's latency should be recorded"
+
+
+@pytest.mark.asyncio
+async def test_session_close_destroys_hedge_sessions(mocker):
+    destroy = mocker.patch('noble_tls.sessions.destroy_session_by_id', return_value=True)
+    session = Session(hedge=HedgePolicy(proxies=["http://ip1:8080", "http://ip2:8080"]))
+    session_ids = [session._hedge_payload({"requestUrl": "https://example.com/"})["sessionId"] for _ in range(3)]
+    assert session_ids == [f"{session._session_id}-hedge-0", f"{session._session_id}-hedge-1",
+                           f"{session._session_id}-hedge-0"], "Every hedge proxy should keep its own session"
+
+    await session.close()
+    assert [call.args[0] for call in destroy.call_args_list] == [
+        session._session_id, f"{session._session_id}-hedge-0", f"{session._session_id}-hedge-1"
+    ]
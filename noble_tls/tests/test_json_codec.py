@@ -0,0 +1,42 @@
+import pytest
+from ..utils import json_codec
+from ..utils.json_codec import JSONCodec, get_codec, set_codec, select_codec
+
+
+@pytest.fixture(autouse=True)
+def restore_codec():
+    previous = json_codec._codec
+    yield
+    json_codec._codec = previous
+
+
+def test_stdlib_codec_round_trip():
+    codec = JSONCodec()
+    encoded = codec.dumps({"key": "välue", "list": [1, 2]})
+    assert isinstance(encoded, bytes), "dumps should return bytes ready for the FFI boundary"
+    assert codec.loads(encoded) == {"key": "välue", "list": [1, 2]}
+    assert codec.loads(encoded.decode('utf-8')) == {"key": "välue", "list": [1, 2]}
+
+
+def test_select_codec_returns_usable_codec():
+    codec = select_codec()
+    assert isinstance(codec, JSONCodec)
+    assert codec.loads(codec.dumps({"a": 1})) == {"a": 1}
+
+
+def test_set_codec_injects_custom_codec():
+    class UpperCodec(JSONCodec):
+        name = "upper"
+
+        def loads(self, data):
+            return super().loads(data).upper()
+
+    set_codec(UpperCodec())
+    assert get_codec().name == "upper"
+    assert get_codec().loads('"abc"') == "ABC"
+
+    set_codec("json")
+    assert type(get_codec()) is JSONCodec
+
+    with pytest.raises(ValueError):
+        set_codec("unknown")
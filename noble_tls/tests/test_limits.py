@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+import pytest
+from ..exceptions.exceptions import TLSClientException
+from ..limits import AdaptiveLimiter, HostLimiter, TokenBucket
+from ..sessions import Session
+
+
+@pytest.mark.asyncio
+async def test_host_limiter_bounds_in_flight_per_host():
+    limiter = HostLimiter(max_in_flight=2, per_host={"slow.example.com": {"max_in_flight": 1}})
+    in_flight = {}
+    peak = {}
+
+    async def request(host):
+        async with limiter.slot(host):
+            host = host.lower()
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), in_flight[host])
+            await asyncio.sleep(0.01)
+            in_flight[host] -= 1
+
+    await asyncio.gather(*(
+        request(host) for host in ["a.example.com"] * 6 + ["slow.example.com"] * 3 + ["B.example.com"] * 4
+    ))
+    assert peak == {"a.example.com": 2, "slow.example.com": 1, "b.example.com": 2}
+    assert limiter.stats() == {"slow.example.com": {"limit": 1, "in_flight": 0, "waiting": 0}}, \
+        "Idle hosts without overrides should be forgotten"
+
+
+@pytest.mark.asyncio
+async def test_host_limiter_cancelled_waiter_does_not_leak_a_slot():
+    limiter = HostLimiter(max_in_flight=1, per_host={"example.com": {}})
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot("example.com"):
+            await release.wait()
+
+    holder = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    assert limiter.stats()["example.com"]["waiting"] == 1
+
+    waiter.cancel()
+    release.set()
+    await holder
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.stats()["example.com"] == {"limit": 1, "in_flight": 0, "waiting": 0}
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100.0, burst=2)
+    started = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+    # two requests fit in the burst, the other four are spaced 10ms apart
+    assert time.monotonic() - started >= 0.035
+
+
+@pytest.mark.asyncio
+async def test_host_limiter_forgets_rate_limited_hosts_once_refilled():
+    limiter = HostLimiter(max_in_flight=4, rate=50.0, burst=1)
+    for index in range(50):
+        async with limiter.slot(f"host{index}.example.com"):
+            pass
+    assert len(limiter._buckets) == 50, "Buckets are kept while they refill, or the next request would burst"
+
+    await asyncio.sleep(0.05)
+    async with limiter.slot("other.example.com"):
+        pass
+    assert set(limiter._gates) == set(limiter._buckets) == {"other.example.com"}
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_refunds_cancelled_waiters():
+    bucket = TokenBucket(rate=10.0, burst=1)
+    await bucket.acquire()
+    waiters = [asyncio.ensure_future(bucket.acquire()) for _ in range(20)]
+    await asyncio.sleep(0)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    # only the token taken above is owed, not the two seconds the cancelled waiters had reserved
+    started = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_session_requests_go_through_limiter(mocker):
+    limiter = HostLimiter(max_in_flight=1)
+    observe = mocker.spy(limiter, "observe")
+    session = Session(limiter=limiter)
+    mocker.patch.object(session, "_send_unlimited", return_value={"status": 200, "id": "mock_id"})
+
+    response = await session._send({"requestUrl": "https://Example.com/path"})
+
+    assert response["status"] == 200
+    host, latency = observe.call_args.args
+    assert host == "example.com" and latency >= 0
+    assert observe.call_args.kwargs == {"status": 200}
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_increases_while_healthy_and_backs_off():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=4)
+
+    async def request(latency, status=200, error=None):
+        async with limiter.slot("example.com"):
+            await asyncio.sleep(0)
+            limiter.observe("example.com", latency, status=status, error=error)
+
+    for _ in range(10):
+        await asyncio.gather(request(0.1), request(0.1), request(0.1), request(0.1))
+    assert limiter.limits()["example.com"]["limit"] == 4, "The limit should grow up to max_limit"
+
+    await request(0.1, status=429)
+    assert limiter.limits()["example.com"]["limit"] == 2
+    # a second failure within the same round trip is not punished again
+    await request(0.1, error=TLSClientException("timeout"))
+    assert limiter.limits()["example.com"]["limit"] == 2
+    assert limiter.limits()["example.com"]["decreases"] == 1
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_holds_limit_on_slow_responses():
+    limiter = AdaptiveLimiter(initial_limit=1, latency_tolerance=2.0)
+
+    async with limiter.slot("example.com"):
+        limiter.observe("example.com", 0.1, status=200)
+    assert limiter.limits()["example.com"]["limit"] == 2
+
+    for _ in range(5):
+        async with limiter.slot("example.com"):
+            async with limiter.slot("example.com"):
+                limiter.observe("example.com", 1.0, status=200)
+    assert limiter.limits()["example.com"]["limit"] == 2, "Slow responses should stop the increase"
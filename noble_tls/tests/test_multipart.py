@@ -0,0 +1,67 @@
+import base64
+import io
+
+import pytest
+from ..multipart import MultipartEncoder
+from ..sessions import Session
+from ..utils.body import encode_stream
+
+
+async def collect(encoder):
+    return b"".join([chunk async for chunk in encoder])
+
+
+@pytest.mark.asyncio
+async def test_multipart_encoder_streams_files(tmp_path):
+    path = tmp_path / "report.csv"
+    path.write_bytes(b"a,b\n1,2\n")
+    encoder = MultipartEncoder(
+        [("name", "nightly"), ("report", ("report.csv", path)), ("raw", ("blob", io.BytesIO(b"\x00\x01"), None))],
+        boundary="XyZ",
+        chunk_size=3,
+    )
+
+    assert encoder.content_type == "multipart/form-data; boundary=XyZ"
+    assert await collect(encoder) == (
+        b'--XyZ\r\nContent-Disposition: form-data; name="name"\r\n\r\nnightly\r\n'
+        b'--XyZ\r\nContent-Disposition: form-data; name="report"; filename="report.csv"\r\nContent-Type: text/csv'
+        b'\r\n\r\na,b\n1,2\n\r\n'
+        b'--XyZ\r\nContent-Disposition: form-data; name="raw"; filename="blob"\r\n'
+        b'Content-Type: application/octet-stream\r\n\r\n\x00\x01\r\n'
+        b'--XyZ--\r\n'
+    )
+
+
+@pytest.mark.asyncio
+async def test_encode_stream_matches_base64_for_any_chunking():
+    body = bytes(range(256)) * 40
+
+    async def chunks():
+        for start in range(0, len(body), 1000):
+            yield body[start:start + 1000]
+
+    assert bytes((await encode_stream(chunks())).data) == base64.b64encode(body)
+    assert bytes((await encode_stream(io.BytesIO(body), chunk_size=6)).data) == base64.b64encode(body)
+
+
+@pytest.mark.asyncio
+async def test_session_sends_file_body_as_byte_request(mocker):
+    session = Session()
+    sent = []
+
+    async def fake_send(request_payload):
+        sent.append(session.json_codec.loads(session._encode_payload(request_payload, session.json_codec)))
+        return {"status": 200, "body": "", "headers": {}, "id": "1"}
+
+    mocker.patch.object(session, "_send", side_effect=fake_send)
+
+    await session.post("https://example.com/upload", data=io.BytesIO(b"payload"))
+    await session.post("https://example.com/upload", data=MultipartEncoder({"field": "value"}, boundary="b"))
+    await session.post("https://example.com/upload", data=MultipartEncoder({"field": "value"}, boundary="c"))
+
+    assert sent[0]["isByteRequest"] is True
+    assert base64.b64decode(sent[0]["requestBody"]) == b"payload"
+    assert sent[0]["sessionId"] == session._session_id, "The static fields are still spliced in"
+    assert sent[1]["headers"]["Content-Type"] == "multipart/form-data; boundary=b"
+    assert sent[2]["headers"]["Content-Type"] == "multipart/form-data; boundary=c"
+    assert base64.b64decode(sent[1]["requestBody"]).startswith(b'--b\r\nContent-Disposition: form-data; name="field"')
@@ -1,5 +1,9 @@
+import io
+import json
+
 import pytest
 from ..response import Response, build_response
+from ..utils import json_stream
 
 
 def test_response_initialization():
@@ -55,3 +59,63 @@ def test_build_response_function():
     assert response.text == '{"message": "Success"}'
     assert response.headers['Content-Type'] == "application/json"
     assert response.json()['message'] == "Success"
+
+
+def test_build_response_decodes_byte_body_once():
+    """Byte responses keep the decoded body in content and only derive text on access."""
+    res_data = {
+        "target": "https://example.com/image.png",
+        "status": 200,
+        "body": "data:text/plain; charset=latin-1;base64,aOlsbG8=",
+        "headers": {"Content-Type": ["text/plain; charset=latin-1"]}
+    }
+
+    response = build_response(res_data, None, is_byte_response=True)
+
+    assert response._text is None, "Text should not be built until it is accessed"
+    assert response.content == b"h\xe9llo"
+    assert response.text == "héllo", "Text should be decoded using the response charset"
+
+
+def test_build_response_materializes_headers_lazily():
+    res_data = {
+        "status": 200,
+        "body": "OK",
+        "headers": {"Set-Cookie": ["a=1", "b=2"], "Server": ["test"]}
+    }
+
+    response = build_response(res_data, None)
+
+    assert response._headers is None, "Headers should not be built until they are accessed"
+    assert response.headers["server"] == "test"
+    assert response.headers["set-cookie"] == ["a=1", "b=2"]
+    assert len(response.cookies) == 0, "A missing cookie jar should be created empty on access"
+
+
+def test_response_iter_json_items_from_streamed_file(tmp_path):
+    path = tmp_path / "export.json"
+    path.write_bytes(b'{"meta": {"count": 3}, "data": {"records": [{"id": 1}, {"id": 2}, {"id": 3}]}}')
+    response = build_response({"status": 200, "body": "", "headers": {}}, None)
+    response.attach_stream(str(path), temporary=False)
+
+    assert list(response.iter_json_items("data.records.item.id", chunk_size=4)) == [1, 2, 3]
+    assert response.json()["meta"] == {"count": 3}
+    assert response._text is None, "Parsing JSON from bytes should not produce text"
+
+
+def test_json_stream_fallback_reads_large_values_in_growing_chunks(mocker):
+    mocker.patch('noble_tls.utils.json_stream.ijson', None)
+    document = json.dumps({"meta": {"blob": "x" * 1_000_000}, "data": {"records": [1, 2]}}).encode()
+    file = io.BytesIO(document)
+    read = mocker.spy(file, "read")
+
+    assert list(json_stream.iter_items(file, "data.records.item", chunk_size=1024)) == [1, 2]
+    assert read.call_count < 20, "Re-parsing a large value after every chunk would be quadratic"
+
+
+def test_response_json_from_byte_body():
+    response = build_response({"status": 200, "body": "data:application/json;base64,WzEsIDIsIDNd", "headers": {}},
+                              None, is_byte_response=True)
+    assert response.json() == [1, 2, 3]
+    assert list(response.iter_json_items()) == [1, 2, 3]
+    assert response._text is None
@@ -0,0 +1,50 @@
+import pytest
+from ..exceptions.exceptions import TLSClientException
+from ..retry import RetryBudget, RetryPolicy, parse_retry_after
+from ..sessions import Session
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470.0) == 10.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_budget_limits_retries_to_a_ratio_of_requests():
+    budget = RetryBudget(ratio=0.5, min_retries_per_second=0, max_tokens=1)
+    assert budget.withdraw()
+    assert not budget.withdraw(), "The budget should be exhausted"
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert budget.stats()["exhausted"] == 1
+
+
+def test_retry_policy_only_retries_idempotent_methods():
+    policy = RetryPolicy(total=2, backoff_base=1.0, budget=RetryBudget())
+    error = TLSClientException("connection reset")
+
+    assert 0 <= policy.next_delay("GET", 0, error=error) <= 1.0
+    assert policy.next_delay("POST", 0, error=error) is None
+    assert policy.next_delay("GET", 2, error=error) is None, "No retries beyond total"
+    assert policy.next_delay("GET", 0, error=ValueError()) is None
+
+
+@pytest.mark.asyncio
+async def test_session_retries_with_retry_after(mocker):
+    session = Session(retry=RetryPolicy(total=3, budget=RetryBudget()))
+    responses = [
+        {"status": 503, "body": "", "headers": {"Retry-After": ["1", "5"]}, "id": "1"},
+        {"status": 0, "body": "timeout", "headers": {}, "id": "2"},
+        {"status": 200, "body": "OK", "headers": {}, "id": "3"},
+    ]
+    mocker.patch.object(session, "_send", side_effect=responses)
+    sleep = mocker.patch("noble_tls.sessions.asyncio.sleep")
+
+    response = await session.get("https://example.com/")
+
+    assert response.status_code == 200
+    assert sleep.call_count == 2
+    assert sleep.call_args_list[0].args == (1.0,)
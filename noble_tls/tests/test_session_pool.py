@@ -0,0 +1,56 @@
+import pytest
+from ..session_pool import SessionPool
+from ..utils.identifiers import Client
+
+
+@pytest.fixture(autouse=True)
+def destroy_session(mocker):
+    return mocker.patch('noble_tls.sessions.destroy_session_by_id', return_value=True)
+
+
+@pytest.mark.asyncio
+async def test_session_pool_reuses_sessions_per_key():
+    async with SessionPool(max_size=4) as pool:
+        async with pool.acquire(client=Client.CHROME_120, proxy="http://proxy:8080") as session:
+            first_id = session._session_id
+            assert session.proxies == {"http": "http://proxy:8080", "https": "http://proxy:8080"}
+
+        async with pool.acquire(client=Client.CHROME_120, proxy="http://proxy:8080") as session:
+            assert session._session_id == first_id, "A matching idle session should be reused"
+
+        async with pool.acquire(client=Client.FIREFOX_120, proxy="http://proxy:8080") as session:
+            assert session._session_id != first_id, "A different fingerprint needs its own session"
+
+        stats = pool.stats()
+        assert stats["created"] == 2
+        assert stats["reused"] == 1
+        assert stats["idle"] == 2 and stats["in_use"] == 0
+
+
+@pytest.mark.asyncio
+async def test_session_pool_evicts_idle_sessions(destroy_session):
+    pool = SessionPool(max_size=1, idle_timeout=0)
+
+    session = await pool.checkout(client=Client.CHROME_120)
+    await pool.checkin(session)
+    assert await pool.evict_idle() == 1
+    destroy_session.assert_called_once_with(session._session_id)
+    assert session.closed
+
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_session_pool_replaces_least_recently_used_when_full():
+    pool = SessionPool(max_size=1, idle_timeout=None)
+
+    chrome = await pool.checkout(client=Client.CHROME_120)
+    await pool.checkin(chrome)
+    firefox = await pool.checkout(client=Client.FIREFOX_120)
+
+    assert chrome.closed, "The idle session should make room for the new key"
+    assert pool.stats()["size"] == 1
+
+    await pool.checkin(firefox)
+    await pool.close()
+    assert firefox.closed
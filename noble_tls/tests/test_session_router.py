@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from ..sessions import Session
+from ..session_router import SessionRouter
+
+
+@pytest.mark.asyncio
+async def test_router_keeps_origins_on_the_same_session(mocker):
+    sessions = [Session() for _ in range(4)]
+    for session in sessions:
+        mocker.patch.object(session, "execute_request", return_value="response")
+    router = SessionRouter(sessions)
+
+    assert router.session_for("https://example.com/a") is router.session_for("https://EXAMPLE.com:443/b")
+
+    for _ in range(3):
+        assert await router.get("https://example.com/") == "response"
+    await router.get("https://example.org/")
+
+    stats = router.stats()
+    assert stats["misses"] == 2, "Each origin should need a new connection once"
+    assert stats["hits"] == 2
+    assert stats["in_flight"] == [0, 0, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_router_bounds_load_per_session(mocker):
+    release = asyncio.Event()
+
+    async def slow_request(**kwargs):
+        await release.wait()
+
+    sessions = [Session() for _ in range(2)]
+    for session in sessions:
+        mocker.patch.object(session, "execute_request", side_effect=slow_request)
+    router = SessionRouter(sessions, load_factor=1.5)
+
+    tasks = [asyncio.ensure_future(router.get("https://example.com/")) for _ in range(6)]
+    await asyncio.sleep(0)
+
+    assert max(router.stats()["in_flight"]) <= 5, "A single hot origin should spill over to the other session"
+    assert router.stats()["spills"] > 0
+
+    release.set()
+    await asyncio.gather(*tasks)
@@ -1,8 +1,15 @@
 import asyncio
+import gc
+import json
+import os
+import time
 
 import pytest
 from unittest.mock import patch, MagicMock
+from ..c.cffi import FFIWorkerPool
 from ..sessions import Session
+from ..exceptions.exceptions import TLSClientException
+from ..retry import RetryPolicy
 from ..utils.structures import CaseInsensitiveDict
 
 import pytest
@@ -23,7 +30,7 @@ async def test_session_execute_request(mocker):
     # Mock external calls
     mocker.patch('ctypes.string_at', return_value=b'{"status": 200, "body": "OK", "headers": {}, "id": "mock_id"}')
     mocker.patch('ctypes.cdll.LoadLibrary')
-    mocker.patch('noble_tls.sessions.free_memory')
+    mocker.patch('noble_tls.c.cffi.free_memory')
 
     session = Session()
 
@@ -46,3 +53,182 @@ async def test_session_execute_request(mocker):
 
     assert response.status_code == 200, "Response should have a status code of 200"
     assert response.text == 'OK', "Response body should be 'OK'"
+
+
+@pytest.mark.asyncio
+async def test_session_payload_template_is_cached_and_invalidated():
+    session = Session(ja3_string="771,4865-4866,0-23,29-23,0")
+    codec = session.json_codec
+
+    payload = codec.loads(session._encode_payload({"requestUrl": "https://example.com"}, codec))
+    assert payload["requestUrl"] == "https://example.com"
+    assert payload["customTlsClient"]["ja3String"] == "771,4865-4866,0-23,29-23,0"
+
+    template = session._static_payload
+    session._encode_payload({"requestUrl": "https://example.org"}, codec)
+    assert session._static_payload is template, "The static fragment should be reused between requests"
+
+    session.ja3_string = "771,4865,0,29,0"
+    payload = codec.loads(session._encode_payload({"requestUrl": "https://example.com"}, codec))
+    assert payload["customTlsClient"]["ja3String"] == "771,4865,0,29,0", "Reassigning a setting rebuilds the template"
+
+
+@pytest.mark.asyncio
+async def test_session_close_destroys_go_session(mocker):
+    destroy = mocker.patch('noble_tls.sessions.destroy_session_by_id', return_value=True)
+
+    async with Session() as session:
+        session_id = session._session_id
+
+    assert session.closed
+    destroy.assert_called_once_with(session_id)
+
+    # closing twice should not destroy the session again
+    await session.close()
+    destroy.assert_called_once()
+
+    with pytest.raises(TLSClientException):
+        await session.get('http://example.com')
+
+
+@pytest.mark.asyncio
+async def test_abandoned_session_is_released(mocker):
+    # sessions left over by earlier tests must not be collected while the release is patched
+    gc.collect()
+    release_session = mocker.patch('noble_tls.c.cffi.FFIWorkerPool.release_session')
+
+    session = Session()
+    session_id = session._session_id
+    del session
+    gc.collect()
+
+    release_session.assert_called_once_with(session_id)
+
+
+@pytest.mark.asyncio
+async def test_session_preconnect_warms_each_origin_once(mocker):
+    session = Session()
+    execute_request = mocker.patch.object(session, "execute_request")
+    execute_request.side_effect = [None, TLSClientException("connection refused")]
+
+    results = await session.preconnect(
+        ["https://example.com/a", "https://example.com/b?x=1", "https://down.example.org/"]
+    )
+
+    assert set(results) == {"https://example.com", "https://down.example.org"}
+    assert isinstance(results["https://example.com"], float)
+    assert isinstance(results["https://down.example.org"], TLSClientException)
+    execute_request.assert_any_call(method="HEAD", url="https://example.com/", allow_redirects=False)
+
+
+@pytest.mark.asyncio
+async def test_session_preconnect_rejects_invalid_concurrency():
+    session = Session()
+    with pytest.raises(ValueError):
+        await session.preconnect(["https://example.com/"], concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_session_fetch_many_bounds_concurrency(mocker):
+    session = Session()
+    in_flight = 0
+    peak = 0
+
+    async def fake_request(method, url, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if url.endswith("/fail"):
+            raise TLSClientException("failed")
+        return f"{method} {url}"
+
+    mocker.patch.object(session, "execute_request", side_effect=fake_request)
+    requests = (f"https://example.com/{i}" for i in range(20))
+
+    results = [item async for item in session.fetch_many(requests, concurrency=4)]
+
+    assert len(results) == 20
+    assert peak <= 4, "No more than `concurrency` requests should be in flight"
+    assert ("https://example.com/3", "GET https://example.com/3") in results
+
+    failing = [{"method": "POST", "url": "https://example.com/fail"}]
+    results = [item async for item in session.fetch_many(failing, return_exceptions=True)]
+    assert isinstance(results[0][1], TLSClientException)
+
+
+@pytest.mark.asyncio
+async def test_session_execute_batch_returns_responses_in_order(mocker):
+    session = Session(worker_pool=FFIWorkerPool(max_workers=3))
+
+    def fake_request(payload):
+        url = json.loads(payload)["requestUrl"]
+        time.sleep(0.4 if url.endswith("/0") else 0.03)
+        return json.dumps({"id": url, "status": 200, "body": url, "headers": {}}).encode()
+
+    mocker.patch('noble_tls.c.cffi.request', side_effect=fake_request)
+    mocker.patch('noble_tls.c.cffi.free_memory')
+
+    urls = [f"https://example.com/{i}" for i in range(16)]
+    started = time.monotonic()
+    responses = await session.execute_batch(urls)
+    assert [response.text for response in responses] == urls
+    # the slow first request holds up one worker, the other two send the remaining fifteen meanwhile
+    assert time.monotonic() - started < 0.5
+
+    session.retry = RetryPolicy()
+    with pytest.raises(TLSClientException):
+        await session.execute_batch(urls)
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_session_coalesces_identical_requests(mocker):
+    session = Session(coalesce=True)
+    release = asyncio.Event()
+
+    async def fake_send(method, request_payload):
+        await release.wait()
+        return {"status": 200, "body": request_payload["requestUrl"], "headers": {}, "id": "1"}
+
+    send = mocker.patch.object(session, "_send_cached", side_effect=fake_send)
+    tasks = [asyncio.ensure_future(session.get("https://example.com/token")) for _ in range(5)]
+    tasks.append(asyncio.ensure_future(session.get("https://example.com/token", headers={"X-Other": "1"})))
+    tasks.append(asyncio.ensure_future(session.post("https://example.com/token")))
+    await asyncio.sleep(0)
+    # a follower giving up does not affect the others
+    tasks.pop(0).cancel()
+    release.set()
+    responses = await asyncio.gather(*tasks)
+
+    assert send.call_count == 3, "Identical GETs should share one request, different headers and POST should not"
+    assert len({id(response) for response in responses}) == len(responses), "Every caller gets its own Response"
+    assert all(response.text == "https://example.com/token" for response in responses)
+    assert session._in_flight_requests == {}
+
+
+@pytest.mark.asyncio
+async def test_session_streams_body_to_file(mocker, tmp_path):
+    session = Session()
+
+    async def fake_send(request_payload):
+        with open(request_payload["streamOutputPath"], "wb") as file:
+            file.write(b"x" * 100_000)
+        assert request_payload["streamOutputBlockSize"] == 4096
+        return {"status": 200, "body": "", "headers": {"Content-Type": ["application/octet-stream"]}, "id": "1"}
+
+    mocker.patch.object(session, "_send", side_effect=fake_send)
+
+    response = await session.get("https://example.com/artifact", stream=True, stream_block_size=4096)
+    path = response.stream_path
+    assert os.path.exists(path)
+    assert [len(chunk) async for chunk in response.aiter_bytes(chunk_size=30_000)] == [30_000] * 3 + [10_000]
+    response.close()
+    assert not os.path.exists(path), "Closing a streamed response deletes its temporary file"
+
+    target = str(tmp_path / "artifact.bin")
+    response = await session.download_to("https://example.com/artifact", target, stream_block_size=4096)
+    response.close()
+    assert os.path.getsize(target) == 100_000, "download_to keeps the file"
+    assert [len(chunk) for chunk in response.iter_content(chunk_size=60_000)] == [60_000, 40_000]
@@ -0,0 +1,22 @@
+from ..utils.structures import CaseInsensitiveDict, CompactHeaders
+
+
+def test_compact_headers_case_insensitive_lookup():
+    headers = CompactHeaders.from_lists({"Content-Type": ["text/html"], "Set-Cookie": ["a=1", "b=2"]})
+
+    assert headers["content-type"] == "text/html"
+    assert headers["SET-COOKIE"] == ["a=1", "b=2"], "Multiple values should stay wrapped in a list"
+    assert "Content-Type" in headers and "X-Missing" not in headers
+    assert list(headers) == ["Content-Type", "Set-Cookie"]
+    assert headers == CaseInsensitiveDict({"content-type": "text/html", "set-cookie": ["a=1", "b=2"]})
+
+
+def test_compact_headers_mutation():
+    headers = CompactHeaders({"Server": "test"})
+
+    headers["SERVER"] = "other"
+    headers["X-Extra"] = "1"
+    del headers["x-extra"]
+
+    assert list(headers.items()) == [("SERVER", "other")], "The case of the last key to be set should be kept"
+    assert headers.get("x-extra") is None
@@ -0,0 +1,60 @@
+import asyncio
+import binascii
+from typing import Any, Union
+
+# Bytes read from a streamed request body at a time, a multiple of 3 so every chunk encodes to base64 without padding
+BODY_CHUNK_SIZE = 3 * 64 * 1024
+
+
+class Base64Body:
+    """A request body that was already base64 encoded, spliced into the tls-client payload as is."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Union[bytes, bytearray]) -> None:
+        self.data = data
+
+
+def is_stream_body(body: Any) -> bool:
+    """Whether a request body is read incrementally: a file-like object or an async iterable of bytes."""
+    return hasattr(body, "read") or hasattr(body, "__aiter__")
+
+
+def encode_bytes(body: Union[bytes, bytearray, memoryview]) -> bytes:
+    """Base64 encode an in-memory request body."""
+    return binascii.b2a_base64(body, newline=False)
+
+
+async def encode_stream(body: Any, chunk_size: int = BODY_CHUNK_SIZE) -> Base64Body:
+    """
+    Read a file-like object or async iterable of bytes and base64 encode it chunk by chunk, so the raw body is never
+    held in memory as a whole. Blocking reads from file objects run in the default executor.
+    :param body: File-like object opened in binary mode, or async iterable of bytes.
+    :param chunk_size: Number of bytes read from a file at a time.
+    :return: The encoded body.
+    """
+    encoded = bytearray()
+    remainder = b""
+
+    def feed(chunk: bytes) -> bytes:
+        # only encode multiples of 3 bytes, the rest waits for the next chunk so no padding ends up mid-body
+        chunk = remainder + bytes(chunk)
+        usable = len(chunk) - len(chunk) % 3
+        encoded.extend(binascii.b2a_base64(chunk[:usable], newline=False))
+        return chunk[usable:]
+
+    if hasattr(body, "__aiter__"):
+        async for chunk in body:
+            remainder = feed(chunk)
+    else:
+        loop = asyncio.get_event_loop()
+        while True:
+            chunk = await loop.run_in_executor(None, body.read, chunk_size)
+            if not chunk:
+                break
+            if isinstance(chunk, str):
+                raise TypeError("File bodies must be opened in binary mode")
+            remainder = feed(chunk)
+
+    encoded.extend(binascii.b2a_base64(remainder, newline=False))
+    return Base64Body(encoded)
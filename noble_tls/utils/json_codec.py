@@ -0,0 +1,101 @@
+import json
+from typing import Any, Optional, Union
+
+
+class JSONCodec:
+    """
+    Serializes the payloads sent to tls-client and parses what it returns.
+
+    ``dumps`` always returns UTF-8 encoded bytes and ``loads`` accepts both ``str`` and ``bytes``, so payloads and
+    responses can cross the FFI boundary without an extra encode/decode step. This base class uses the stdlib ``json``
+    module; subclass it and override both methods to plug in your own.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+        self.dumps = msgspec.json.encode
+        self.loads = msgspec.json.decode
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def __init__(self) -> None:
+        import ujson
+        self._ujson = ujson
+        self.loads = ujson.loads
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode('utf-8')
+
+
+# Tried in this order when no codec was chosen explicitly, the stdlib codec is always available as a fallback
+CODECS = {
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+    UjsonCodec.name: UjsonCodec,
+    JSONCodec.name: JSONCodec,
+}
+
+_codec: Optional[JSONCodec] = None
+
+
+def select_codec() -> JSONCodec:
+    """
+    Pick the fastest installed JSON library.
+    :return: A codec for orjson, msgspec or ujson if one of them is installed, the stdlib codec otherwise.
+    """
+    for codec_class in CODECS.values():
+        try:
+            return codec_class()
+        except ImportError:
+            continue
+    return JSONCodec()
+
+
+def get_codec() -> JSONCodec:
+    """
+    Return the process-wide codec, selecting one on first use.
+    :return: The current JSONCodec.
+    """
+    global _codec
+    if _codec is None:
+        _codec = select_codec()
+    return _codec
+
+
+def set_codec(codec: Union[str, JSONCodec, None]) -> JSONCodec:
+    """
+    Replace the process-wide codec.
+    :param codec: A JSONCodec instance, the name of a bundled codec ("orjson", "msgspec", "ujson", "json"), or None to
+        go back to automatic selection.
+    :return: The codec now in use.
+    """
+    global _codec
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown JSON codec {codec!r}, expected one of {list(CODECS)}")
+        codec = CODECS[codec]()
+    _codec = codec
+    return get_codec()
@@ -0,0 +1,145 @@
+import codecs
+import json
+from typing import Any, BinaryIO, Iterator, List, Optional
+
+try:
+    import ijson
+except ImportError:  # optional, the fallback parser below is used without it
+    ijson = None
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+# Characters that can follow a complete value, anything else means a number was cut off at the end of the buffer
+_DELIMITERS = frozenset(_WHITESPACE + ",:]}")
+
+
+def iter_items(file: BinaryIO, prefix: str = "item", chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Yield the JSON values found at ``prefix`` while reading ``file`` incrementally.
+
+    Prefixes follow ijson: dot separated object keys, with ``item`` standing for the elements of an array, e.g.
+    ``"item"`` for the elements of a top-level array, ``"data.results.item"`` for the elements of the ``results`` array
+    inside the ``data`` object, and ``""`` for the whole document. ijson is used if it is installed. The fallback parser
+    only keeps one matching value in memory at a time, but materializes values that are skipped on the way to the
+    prefix, so install ijson when large values precede the ones you are after.
+
+    :param file: Binary file-like object containing UTF-8 JSON.
+    :param prefix: Path of the values to yield.
+    :param chunk_size: Number of bytes read at a time.
+    """
+    if ijson is not None:
+        yield from ijson.items(file, prefix, use_float=True, buf_size=chunk_size)
+        return
+    reader = _Reader(file, chunk_size)
+    yield from _walk(reader, prefix.split(".") if prefix else [])
+    reader.end()
+
+
+class _Reader:
+    """Incrementally decoded text buffer of a JSON document, values are parsed with the stdlib raw_decode."""
+
+    __slots__ = ("_file", "_chunk_size", "_decoder", "buffer", "pos", "eof")
+
+    def __init__(self, file: BinaryIO, chunk_size: int) -> None:
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: Optional[int] = None) -> None:
+        """Read another chunk, ``size`` bytes instead of the chunk size if given, dropping what was already parsed."""
+        if self.eof:
+            return
+        chunk = self._file.read(size or self._chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + self._decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+
+    def peek(self) -> str:
+        """The next non-whitespace character, without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                raise ValueError("Unexpected end of JSON document")
+            self._fill()
+
+    def next(self) -> str:
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    def expect(self, char: str) -> None:
+        found = self.next()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at JSON offset {self.pos - 1}, found {found!r}")
+
+    def value(self) -> Any:
+        """Parse the next complete value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # a number cut off at the end of the buffer parses fine, but might continue in the next chunk
+                if self.eof or end < len(self.buffer) and self.buffer[end] in _DELIMITERS:
+                    self.pos = end
+                    return value
+            # every attempt parses the value from its start, so at least double what is buffered to stay linear
+            self._fill(max(self._chunk_size, len(self.buffer) - self.pos))
+
+    def end(self) -> None:
+        while not self.eof:
+            self._fill()
+        if self.buffer[self.pos:].strip(_WHITESPACE):
+            raise ValueError("Extra data after JSON document")
+
+
+def _walk(reader: _Reader, path: List[str]) -> Iterator[Any]:
+    if not path:
+        yield reader.value()
+        return
+
+    head, rest = path[0], path[1:]
+    if head == "item":
+        if reader.peek() != "[":
+            reader.value()
+            return
+        reader.next()
+        if reader.peek() == "]":
+            reader.next()
+            return
+        while True:
+            yield from _walk(reader, rest)
+            separator = reader.next()
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' at JSON offset {reader.pos - 1}, found {separator!r}")
+
+    if reader.peek() != "{":
+        reader.value()
+        return
+    reader.next()
+    if reader.peek() == "}":
+        reader.next()
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == head:
+            yield from _walk(reader, rest)
+        else:
+            reader.value()
+        separator = reader.next()
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or '}}' at JSON offset {reader.pos - 1}, found {separator!r}")
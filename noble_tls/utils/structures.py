@@ -72,3 +72,96 @@ class CaseInsensitiveDict(MutableMapping):
 
     def __repr__(self):
         return str(dict(self.items()))
+
+
+class CompactHeaders(MutableMapping):
+    """A compact, case-insensitive ``dict``-like object for response headers.
+
+    Keys and values are kept in two parallel tuples plus a tuple of
+    lowercased keys used as the lookup index, instead of a dict of
+    ``(key, value)`` pairs. For the handful of headers a response
+    carries this needs a fraction of the memory of a
+    ``CaseInsensitiveDict`` while lookups stay case insensitive::
+
+        headers = CompactHeaders({'Content-Type': 'text/html'})
+        headers['content-type'] == 'text/html'  # True
+        list(headers) == ['Content-Type']  # True
+
+    Headers are rarely modified after a response is built, so setting or
+    deleting a key rebuilds the tuples.
+    """
+
+    __slots__ = ("_keys", "_values", "_lower_keys")
+
+    def __init__(self, data=None, **kwargs):
+        self._keys = ()
+        self._values = ()
+        self._lower_keys = ()
+        if data is not None or kwargs:
+            items = dict(data or {}, **kwargs)
+            self._keys = tuple(items)
+            self._values = tuple(items.values())
+            self._lower_keys = tuple(key.lower() for key in self._keys)
+
+    @classmethod
+    def from_lists(cls, raw_headers):
+        """Builds the store from a ``{name: [values]}`` mapping, single values are not wrapped in a list."""
+        headers = cls()
+        headers._keys = tuple(raw_headers)
+        headers._values = tuple(value[0] if len(value) == 1 else value for value in raw_headers.values())
+        headers._lower_keys = tuple(key.lower() for key in headers._keys)
+        return headers
+
+    def _position(self, key):
+        try:
+            return self._lower_keys.index(key.lower())
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __getitem__(self, key):
+        return self._values[self._position(key)]
+
+    def __setitem__(self, key, value):
+        try:
+            position = self._position(key)
+        except KeyError:
+            self._keys += (key,)
+            self._values += (value,)
+            self._lower_keys += (key.lower(),)
+        else:
+            # remember the case of the last key to be set, like CaseInsensitiveDict
+            self._keys = self._keys[:position] + (key,) + self._keys[position + 1:]
+            self._values = self._values[:position] + (value,) + self._values[position + 1:]
+
+    def __delitem__(self, key):
+        position = self._position(key)
+        self._keys = self._keys[:position] + self._keys[position + 1:]
+        self._values = self._values[:position] + self._values[position + 1:]
+        self._lower_keys = self._lower_keys[:position] + self._lower_keys[position + 1:]
+
+    def __contains__(self, key):
+        return isinstance(key, str) and key.lower() in self._lower_keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def lower_items(self):
+        """Like iteritems(), but with all lowercase keys."""
+        return zip(self._lower_keys, self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            other = CaseInsensitiveDict(other)
+        else:
+            return NotImplemented
+        # Compare insensitively
+        return dict(self.lower_items()) == dict(other.lower_items())
+
+    def copy(self):
+        return CompactHeaders(zip(self._keys, self._values))
+
+    def __repr__(self):
+        return str(dict(self.items()))
@@ -21,6 +21,7 @@ setup(
     long_description_content_type="text/markdown",
     packages=find_packages(exclude=["tests"]),
     install_requires=["httpx", "distro", "requests"],
+    extras_require={"speedups": ["orjson"], "streaming": ["ijson"]},
     classifiers=[
         "Environment :: Web Environment",
         "Intended Audience :: Developers",